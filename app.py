@@ -1,19 +1,134 @@
+import asyncio
 import uvicorn
-from fastapi import FastAPI
+import time
+import uuid
+from fastapi import FastAPI, Request
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 from starlette import status
 from starlette.middleware.sessions import SessionMiddleware
-from starlette.responses import RedirectResponse
+from starlette.responses import JSONResponse, RedirectResponse, Response
 from controller.app_controller import application
 from controller.auth_controller import authentication
+from faceapp.constant import EMBEDDING_INDEX_REFRESH_SECONDS, WARM_UP_ON_STARTUP
+from faceapp.data_access.async_user_data import AsyncUserData
+from faceapp.data_access.async_user_embedding_data import AsyncUserEmbeddingData
+from faceapp.data_access.user_embedding_data import UserEmbeddingData
+from faceapp.logger import correlation_id, logging
+from faceapp.inference.model_registry import ModelRegistry
+from faceapp.metrics import REQUEST_LATENCY
 
 app = FastAPI()
 
 
+def load_embedding_index(refresh: bool = False) -> None:
+    # Runs in the executor, where the database client is built as well, so an
+    # unreachable database fails this job instead of the application startup.
+    UserEmbeddingData().load_embedding_index(refresh)
+
+
+def log_failure(job: str):
+    # Background jobs are never awaited; log their errors instead of dropping them.
+    def callback(future: asyncio.Future) -> None:
+        if not future.cancelled() and future.exception() is not None:
+            logging.error(f"{job} Failed: {future.exception()}")
+
+    return callback
+
+
+@app.on_event("startup")
+async def load_models():
+    # Warm up the models and fill the identification index in the background.
+    # Without warm-up the ML stack is imported and loaded on first use instead.
+    loop = asyncio.get_running_loop()
+    if WARM_UP_ON_STARTUP:
+        app.state.warm_up = loop.run_in_executor(None, ModelRegistry.warm_up)
+        app.state.warm_up.add_done_callback(log_failure("Model Warm-up"))
+    loop.run_in_executor(None, load_embedding_index).add_done_callback(
+        log_failure("Embedding Index Load")
+    )
+
+
+@app.on_event("startup")
+async def refresh_embedding_index():
+    # Rebuild the identification index periodically so users enrolled by other
+    # processes, such as the bulk enrollment CLI, become identifiable.
+    async def refresh() -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(EMBEDDING_INDEX_REFRESH_SECONDS)
+            try:
+                await loop.run_in_executor(None, load_embedding_index, True)
+            except Exception as e:
+                logging.error(f"Embedding Index Refresh Failed: {e}")
+
+    if EMBEDDING_INDEX_REFRESH_SECONDS > 0:
+        app.state.index_refresh = asyncio.create_task(refresh())
+
+
+@app.on_event("startup")
+async def create_indexes():
+    try:
+        await AsyncUserData().create_indexes()
+        await AsyncUserEmbeddingData().create_indexes()
+    except Exception as e:
+        # Existing duplicates block a unique index; keep serving and report it.
+        logging.error(f"Index Creation Failed: {e}")
+
+
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    start = time.perf_counter()
+    response = await call_next(request)
+    # Label by route template so path parameters do not create new series.
+    route = request.scope.get("route")
+    path = route.path if route is not None else "unmatched"
+    REQUEST_LATENCY.labels(request.method, path, response.status_code).observe(
+        time.perf_counter() - start
+    )
+    return response
+
+
+@app.middleware("http")
+async def assign_correlation_id(request: Request, call_next):
+    # Tag every log line of the request; reuse the caller's ID when one is sent.
+    request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex
+    token = correlation_id.set(request_id)
+    try:
+        response = await call_next(request)
+    finally:
+        correlation_id.reset(token)
+    response.headers["X-Request-ID"] = request_id
+    return response
+
+
 @app.get("/")
 def read_root():
     return RedirectResponse(url="/auth", status_code=status.HTTP_302_FOUND)
 
 
+@app.get("/ready")
+def readiness_probe():
+    if ModelRegistry.ready or not WARM_UP_ON_STARTUP:
+        return JSONResponse(
+            status_code=status.HTTP_200_OK, content={"status": True, "message": "Ready"}
+        )
+    warm_up = getattr(app.state, "warm_up", None)
+    if warm_up is not None and warm_up.done() and warm_up.exception() is not None:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": False, "message": "Model warm-up failed"},
+        )
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"status": False, "message": "Models are warming up"},
+    )
+
+
+@app.get("/metrics")
+def metrics():
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
 app.include_router(authentication.router)
 
 app.include_router(application.router)
@@ -0,0 +1,8 @@
+import os
+
+# Benchmarks run offline against the in-process MongoDB stand-in unless
+# BENCHMARK_MONGODB_URL names a real server, which servers started by the
+# load test inherit through their environment.
+os.environ["MONGODB_URL_KEY"] = os.environ.get(
+    "BENCHMARK_MONGODB_URL", "mongomock://benchmarks"
+)
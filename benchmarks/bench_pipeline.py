@@ -0,0 +1,192 @@
+"""
+Microbenchmarks of the face pipeline and the data access layer.
+
+Usage:
+    python -m benchmarks.bench_pipeline --output benchmarks/baseline.json
+    python -m benchmarks.bench_pipeline --baseline benchmarks/baseline.json
+
+Timings are machine specific, so no baseline is committed: record one with
+--output on the machine that runs the comparison, then pass it as --baseline.
+"""
+
+import argparse
+import os
+import sys
+import numpy as np
+
+from benchmarks.fixtures import face_burst, face_bytes
+from benchmarks.timing import compare_results, load_results, measure, save_results
+
+
+def bench_data_access(repeat: int) -> dict:
+    from faceapp.data_access.embedding_cache import embedding_cache
+    from faceapp.data_access.user_data import UserData
+    from faceapp.data_access.user_embedding_data import UserEmbeddingData
+    from faceapp.entity.user import User
+
+    results = {}
+    user_data = UserData()
+    user_embedding_data = UserEmbeddingData()
+    embedding = np.random.default_rng(0).standard_normal(128).astype(np.float32)
+
+    users = iter(
+        User("Bench", f"user{i}", f"user{i}@bench.io", "0", "password", "password")
+        for i in range(10 * (repeat + 2))
+    )
+    results["user_data.save_user"] = measure(
+        lambda: user_data.save_user(dict(next(users).to_dict())), repeat
+    )
+    results["user_data.get_user"] = measure(
+        lambda: user_data.get_user({"email_id": "user1@bench.io"}), repeat
+    )
+
+    uuids = iter(f"bench-{i}" for i in range(10 * (repeat + 2)))
+    results["user_embedding_data.save_user_embedding"] = measure(
+        lambda: user_embedding_data.save_user_embedding(next(uuids), embedding), repeat
+    )
+
+    def get_uncached():
+        embedding_cache.clear()
+        user_embedding_data.get_user_embedding("bench-0")
+
+    results["user_embedding_data.get_user_embedding"] = measure(get_uncached, repeat)
+    results["user_embedding_data.get_user_embedding_cached"] = measure(
+        lambda: user_embedding_data.get_user_embedding("bench-0"), repeat
+    )
+    return results
+
+
+def bench_pipeline(repeat: int, frames: int) -> dict:
+    from faceapp.inference.face_detector import FaceTrack, cascade_face_detector
+    from faceapp.inference.model_registry import ModelRegistry
+    from faceapp.user.image_preprocessing import ImagePreprocessing
+    from faceapp.user.user_embedding_val import UserLoginEmbeddingValidation
+
+    results = {}
+    image_bytes = face_bytes(size=(3024, 4032))
+    burst = face_burst(frames)
+    img_array = ImagePreprocessing.decode_image(face_bytes())
+
+    results["decode_image_12mp"] = measure(
+        lambda: ImagePreprocessing.decode_image(image_bytes), repeat
+    )
+
+    ModelRegistry.warm_up()
+    # Time the detection path, not the fallback taken when no face is found.
+    regions = []
+    UserLoginEmbeddingValidation.detect_faces(
+        [ImagePreprocessing.decode_image(frame) for frame in [face_bytes()] + burst],
+        regions,
+    )
+    if any(region is None for region in regions):
+        sys.exit(f"No face detected in the benchmark fixtures: {regions}")
+
+    results["generate_embedding"] = measure(
+        lambda: UserLoginEmbeddingValidation.generate_embedding(img_array), repeat
+    )
+
+    # Unique trailing bytes make every frame a miss in both image cache tiers;
+    # JPEG decoders ignore data after the end of the image.
+    def generate_uncached() -> None:
+        UserLoginEmbeddingValidation.generate_embedding_list(
+            [frame + os.urandom(16) for frame in burst]
+        )
+
+    results[f"generate_embedding_list_{frames}_frames"] = measure(
+        generate_uncached, repeat
+    )
+    # The same burst uploaded again is served from the image cache.
+    results[f"generate_embedding_list_{frames}_frames_cache_hit"] = measure(
+        lambda: UserLoginEmbeddingValidation.generate_embedding_list(burst), repeat
+    )
+
+    # Detection over a burst, from scratch on every frame and with region tracking.
+    burst_arrays = [ImagePreprocessing.decode_image(frame) for frame in burst]
+
+    def detect_burst(tracking: bool) -> FaceTrack:
+        track = FaceTrack(enabled=tracking)
+        for frame in burst_arrays:
+            cascade_face_detector.detect(frame, track=track)
+        return track
+
+    # The tracked timing is only meaningful if frames re-use the anchor region.
+    if detect_burst(True).hits == 0:
+        sys.exit("No burst frame matched the tracked face region.")
+
+    results[f"detect_burst_{frames}_frames"] = measure(
+        lambda: detect_burst(False), repeat
+    )
+    results[f"detect_burst_{frames}_frames_tracked"] = measure(
+        lambda: detect_burst(True), repeat
+    )
+    return results
+
+
+def bench_math(repeat: int, frames: int) -> dict:
+    from faceapp.user.template_matching import TemplateMatcher
+    from faceapp.user.user_embedding_val import UserLoginEmbeddingValidation
+
+    rng = np.random.default_rng(0)
+    embedding_list = rng.standard_normal((frames, 128)).astype(np.float32)
+    db_embedding = rng.standard_normal(128).astype(np.float32)
+    avg_embedding = embedding_list.mean(axis=0)
+    templates = TemplateMatcher.select_templates(
+        rng.standard_normal((2 * frames, 128)).astype(np.float32)
+    )
+    return {
+        "average_embedding": measure(
+            lambda: UserLoginEmbeddingValidation.average_embedding(embedding_list),
+            repeat * 50,
+        ),
+        "cosine_simmilarity": measure(
+            lambda: UserLoginEmbeddingValidation.cosine_simmilarity(
+                db_embedding, avg_embedding
+            ),
+            repeat * 50,
+        ),
+        "template_score": measure(
+            lambda: TemplateMatcher.score(templates, embedding_list),
+            repeat * 50,
+        ),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Face pipeline microbenchmarks.")
+    parser.add_argument("--output", default="bench_output.json")
+    parser.add_argument("--baseline", help="Baseline JSON to compare against.")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--frames", type=int, default=5)
+    parser.add_argument(
+        "--skip-model", action="store_true", help="Skip benchmarks needing the models."
+    )
+    args = parser.parse_args()
+    if args.baseline and not os.path.exists(args.baseline):
+        parser.error(
+            f"baseline {args.baseline} does not exist; record one with --output first"
+        )
+
+    results = bench_data_access(args.repeat)
+    results.update(bench_math(args.repeat, args.frames))
+    if not args.skip_model:
+        results.update(bench_pipeline(args.repeat, args.frames))
+    save_results(results, args.output)
+
+    for name, result in sorted(results.items()):
+        print(
+            f"{name:55s} p50 {result['p50_ms']:9.3f} ms  p95 {result['p95_ms']:9.3f} ms"
+        )
+
+    if args.baseline:
+        regressions = compare_results(
+            results, load_results(args.baseline), args.tolerance
+        )
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Accuracy and throughput of the float16 and int8 embedding representations
+against float32 on a synthetic enrolled population.
+
+Usage:
+    python -m benchmarks.bench_quantization --population 100000 --output quant.json
+"""
+
+import argparse
+import numpy as np
+
+from benchmarks.timing import measure, save_results
+
+
+def synthetic_population(size: int, probes: int, noise: float, seed: int = 0):
+    # Unit-norm enrolled rows and probes that are noisy copies of known rows.
+    rng = np.random.default_rng(seed)
+    population = rng.standard_normal((size, 128)).astype(np.float32)
+    population /= np.linalg.norm(population, axis=1, keepdims=True)
+    targets = rng.choice(size, probes, replace=False)
+    probe_rows = population[targets] + noise * rng.standard_normal(
+        (probes, 128)
+    ).astype(np.float32)
+    probe_rows /= np.linalg.norm(probe_rows, axis=1, keepdims=True)
+    return population, probe_rows, targets
+
+
+def bench_quantization(
+    size: int, probes: int, top_k: int, repeat: int, noise: float
+) -> dict:
+    from faceapp.constant import SIMILARITY_THRESHOLD
+    from faceapp.data_access.embedding_index import EmbeddingIndex
+    from faceapp.data_access.embedding_quantization import EmbeddingQuantizer
+
+    population, probe_rows, targets = synthetic_population(size, probes, noise)
+    results, reference = {}, None
+    for dtype in ("float32", "float16", "int8"):
+        # Index the values read back from storage in this dtype.
+        stored = EmbeddingQuantizer.dequantize(
+            *EmbeddingQuantizer.quantize(population, dtype)
+        )
+        index = EmbeddingIndex(capacity=size, dtype=dtype)
+        for row, embedding in enumerate(stored):
+            index.upsert(str(row), embedding)
+
+        matches = [index.search(probe, top_k) for probe in probe_rows]
+        top1 = np.array([int(match[0][0]) for match in matches])
+        scores = np.array([match[0][1] for match in matches])
+        if reference is None:
+            reference = {"top1": top1, "scores": scores}
+
+        result = measure(lambda: index.search(probe_rows[0], top_k), repeat)
+        result.update(
+            {
+                "index_bytes": index.nbytes,
+                "scan_gb_per_s": index.nbytes / (result["p50_ms"] / 1000) / 1e9,
+                "top1_accuracy": float(np.mean(top1 == targets)),
+                "top1_agreement": float(np.mean(top1 == reference["top1"])),
+                "recall_at_k": float(
+                    np.mean(
+                        [
+                            str(target) in {uuid_ for uuid_, _ in match}
+                            for target, match in zip(targets, matches)
+                        ]
+                    )
+                ),
+                "max_score_error": float(np.abs(scores - reference["scores"]).max()),
+                "decision_agreement": float(
+                    np.mean(
+                        (scores >= SIMILARITY_THRESHOLD)
+                        == (reference["scores"] >= SIMILARITY_THRESHOLD)
+                    )
+                ),
+            }
+        )
+        results[f"index_search[{dtype}]"] = result
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Quantized embedding report.")
+    parser.add_argument("--output", default="bench_quantization.json")
+    parser.add_argument("--population", type=int, default=100000)
+    parser.add_argument("--probes", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--noise", type=float, default=0.05)
+    args = parser.parse_args()
+
+    results = bench_quantization(
+        args.population, args.probes, args.top_k, args.repeat, args.noise
+    )
+    save_results(results, args.output)
+
+    for name, result in sorted(results.items()):
+        print(
+            f"{name:24s} p50 {result['p50_ms']:8.3f} ms  "
+            f"{result['index_bytes'] / 1e6:8.1f} MB  "
+            f"top1 {result['top1_agreement']:.4f}  "
+            f"max err {result['max_score_error']:.5f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
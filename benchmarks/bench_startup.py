@@ -0,0 +1,108 @@
+"""
+Cold start benchmarks: module import times and the time until a fresh app
+answers /ready, each measured in a new interpreter.
+
+Usage:
+    python -m benchmarks.bench_startup --output benchmarks/startup_baseline.json
+    python -m benchmarks.bench_startup --baseline benchmarks/startup_baseline.json
+
+Timings are machine specific, so no baseline is committed: record one with
+--output on the machine that runs the comparison, then pass it as --baseline.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+from benchmarks.timing import compare_results, load_results, measure, save_results
+
+# Modules timed on import, from the bare interpreter to the full application.
+IMPORT_TARGETS = (
+    "faceapp.constant",
+    "controller.auth_controller.authentication",
+    "controller.app_controller.application",
+    "app",
+)
+
+BOOT_TO_READY = """
+import time
+from fastapi.testclient import TestClient
+from app import app
+
+with TestClient(app) as client:
+    while client.get("/ready").status_code != 200:
+        time.sleep(0.01)
+"""
+
+
+# The repository root, so the fresh interpreters import this checkout.
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_python(code: str) -> None:
+    env = dict(os.environ, PYTHONPATH=ROOT_DIR, TF_CPP_MIN_LOG_LEVEL="3")
+    subprocess.run(
+        [sys.executable, "-c", code],
+        check=True,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+def bench_startup(repeat: int, skip_model: bool) -> dict:
+    results = {"interpreter": measure(lambda: run_python("pass"), repeat, warmup=1)}
+    for module in IMPORT_TARGETS:
+        results[f"import[{module}]"] = measure(
+            lambda: run_python(f"import {module}"), repeat, warmup=1
+        )
+    results["boot_to_ready[no_warm_up]"] = measure(
+        lambda: run_python(
+            f"import os; os.environ['WARM_UP_ON_STARTUP'] = 'false'\n{BOOT_TO_READY}"
+        ),
+        repeat,
+        warmup=1,
+    )
+    if not skip_model:
+        results["boot_to_ready"] = measure(
+            lambda: run_python(BOOT_TO_READY), repeat, warmup=1
+        )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Startup time benchmarks.")
+    parser.add_argument("--output", default="bench_startup.json")
+    parser.add_argument("--baseline", help="Baseline JSON to compare against.")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--skip-model", action="store_true", help="Skip booting with model warm-up."
+    )
+    args = parser.parse_args()
+    if args.baseline and not os.path.exists(args.baseline):
+        parser.error(
+            f"baseline {args.baseline} does not exist; record one with --output first"
+        )
+
+    results = bench_startup(args.repeat, args.skip_model)
+    save_results(results, args.output)
+
+    for name, result in results.items():
+        print(
+            f"{name:55s} p50 {result['p50_ms']:9.1f} ms  p95 {result['p95_ms']:9.1f} ms"
+        )
+
+    if args.baseline:
+        regressions = compare_results(
+            results, load_results(args.baseline), args.tolerance
+        )
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+import io
+import os
+from PIL import Image
+from typing import List
+
+# Crop of the astronaut portrait bundled with scikit-image (NASA, public domain).
+# MTCNN finds its face, so the benchmarks time the full detection path.
+FACE_IMAGE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "face.jpg")
+# Centre of the face in the fixture, the pivot of the burst jitter.
+FACE_CENTER = (160, 115)
+
+
+def face_image(size=None) -> Image.Image:
+    with Image.open(FACE_IMAGE_PATH) as image:
+        image = image.convert("RGB")
+    return image if size is None else image.resize(size)
+
+
+def face_bytes(size=None, format: str = "JPEG") -> bytes:
+    buffer = io.BytesIO()
+    face_image(size).save(buffer, format=format, quality=90)
+    return buffer.getvalue()
+
+
+def face_burst(count: int) -> List[bytes]:
+    # Frames of the subject with the slight tilt and shake of a handheld burst.
+    base = face_image()
+    frames = []
+    for index in range(count):
+        shifted = base.rotate(index * 0.5, center=FACE_CENTER, translate=(index % 2, 0))
+        buffer = io.BytesIO()
+        shifted.save(buffer, format="JPEG", quality=90)
+        frames.append(buffer.getvalue())
+    return frames
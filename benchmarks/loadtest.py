@@ -0,0 +1,374 @@
+"""
+End-to-end load test of the FastAPI app. Virtual users run enroll journeys
+(/auth/register then /application/register_embedding) and login journeys
+(/auth/ then /application/) in a weighted mix, each in a closed loop, and the
+report gives throughput, p50/p95/p99 latency and the error rate per endpoint.
+
+The app is served by uvicorn, in this process (--mode inprocess) or as a
+uvicorn subprocess with --workers processes (--mode uvicorn), or an already
+running server is targeted with --url. The app runs on the in-process MongoDB
+stand-in unless --mongodb-url is given; the stand-in is per process, so
+multi-worker runs need a real MongoDB. --stub-model replaces the
+face detector and the embedding model with cheap deterministic stand-ins to
+measure the serving overhead without inference.
+
+Usage:
+    python -m benchmarks.loadtest --concurrency 16 --duration 30 --output load.json
+    python -m benchmarks.loadtest --mode uvicorn --workers 4 --mix enroll=1,login=9
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+import numpy as np
+from collections import defaultdict
+from types import SimpleNamespace
+
+from benchmarks.bench_startup import ROOT_DIR
+from benchmarks.fixtures import face_bytes
+
+# Endpoints of every journey, in the order they are called.
+JOURNEYS = {
+    "enroll": ("POST /auth/register", "POST /application/register_embedding"),
+    "login": ("POST /auth/", "POST /application/"),
+}
+# Within the 8 to 16 characters accepted at registration.
+PASSWORD = "loadtest-pass"
+
+
+class StubModel:
+    """
+    Embedding model stand-in: a fixed random projection of the pooled face
+    pixels, so the same image always gets the same embedding.
+    """
+
+    def __init__(self, input_shape=(160, 160, 3), pool: int = 8) -> None:
+        from faceapp.constant import EMBEDDING_SIZE
+
+        self.layers = [SimpleNamespace(input_shape=(None, *input_shape))]
+        self.pool = pool
+        self.projection = (
+            np.random.default_rng(0)
+            .standard_normal((pool * pool * input_shape[2], EMBEDDING_SIZE))
+            .astype(np.float32)
+        )
+
+    def predict(self, face_batch: np.ndarray) -> np.ndarray:
+        n, height, width, channels = face_batch.shape
+        pooled = face_batch.reshape(
+            n, self.pool, height // self.pool, self.pool, width // self.pool, channels
+        ).mean(axis=(2, 4))
+        return pooled.reshape(n, -1) @ self.projection
+
+
+def install_stub_model() -> None:
+    # Serve the whole frame as the face and embed it with the stub model.
+    from faceapp.inference.face_detector import cascade_face_detector
+    from faceapp.inference.model_registry import ModelRegistry
+
+    ModelRegistry.detector = SimpleNamespace()
+    ModelRegistry.model = StubModel()
+    ModelRegistry.ready = True
+    cascade_face_detector.detect = lambda img_array, deadline=None, track=None: (
+        img_array,
+        [0, 0, img_array.shape[1], img_array.shape[0]],
+    )
+
+
+def create_app():
+    # uvicorn application factory, also used by the in-process server.
+    if os.environ.get("LOADTEST_STUB_MODEL") == "1":
+        os.environ["WARM_UP_ON_STARTUP"] = "false"
+        install_stub_model()
+    from app import app
+
+    return app
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(mode: str, workers: int, stub_model: bool):
+    # Start the app and return its base URL and a function that stops it.
+    import uvicorn
+
+    os.environ["LOADTEST_STUB_MODEL"] = "1" if stub_model else "0"
+    port = free_port()
+
+    if mode == "inprocess":
+        server = uvicorn.Server(
+            uvicorn.Config(create_app(), port=port, log_level="warning")
+        )
+        thread = threading.Thread(target=server.run, daemon=True)
+        thread.start()
+
+        def stop() -> None:
+            server.should_exit = True
+            thread.join()
+
+    else:
+        process = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "uvicorn",
+                "benchmarks.loadtest:create_app",
+                "--factory",
+                "--port",
+                str(port),
+                "--workers",
+                str(workers),
+                "--log-level",
+                "warning",
+            ],
+            cwd=os.getcwd(),
+            env=dict(os.environ, PYTHONPATH=ROOT_DIR),
+        )
+
+        def stop() -> None:
+            process.terminate()
+            process.wait()
+
+    return f"http://127.0.0.1:{port}", stop
+
+
+async def wait_until_ready(base_url: str, timeout: float) -> None:
+    import httpx
+
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get("/ready")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise TimeoutError(f"{base_url} was not ready after {timeout} s")
+
+
+class LoadTest:
+    """
+    Closed-loop virtual users sharing the pool of enrolled accounts. Every
+    request is recorded under its endpoint with its latency and outcome.
+    """
+
+    def __init__(
+        self, base_url: str, mix: dict, frames: list, repeat_frames: bool = False
+    ) -> None:
+        self.base_url = base_url
+        self.journeys = list(mix)
+        self.weights = [mix[journey] for journey in self.journeys]
+        self.frames = frames
+        self.repeat_frames = repeat_frames
+        self.accounts = []
+        self.run_id = int(time.time())
+        self.counter = 0
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.recording = False
+
+    async def call(self, client, endpoint: str, **kwargs) -> bool:
+        method, path = endpoint.split(" ", 1)
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, path, **kwargs)
+            ok = 200 <= response.status_code < 300
+        except Exception:
+            ok = False
+        if self.recording:
+            self.latencies[endpoint].append(time.perf_counter() - start)
+            if not ok:
+                self.errors[endpoint] += 1
+        return ok
+
+    def upload(self) -> list:
+        # Camera frames are never byte-identical, so by default every upload gets
+        # random bytes after the JPEG end marker to miss the image embedding cache.
+        return [
+            (
+                "files",
+                (
+                    "frame.jpg",
+                    frame if self.repeat_frames else frame + os.urandom(16),
+                    "image/jpeg",
+                ),
+            )
+            for frame in self.frames
+        ]
+
+    async def enroll(self, client) -> None:
+        self.counter += 1
+        name = f"load{self.run_id}x{self.counter}"
+        account = {"email_id": f"{name}@loadtest.io", "password": PASSWORD}
+        registered = await self.call(
+            client,
+            JOURNEYS["enroll"][0],
+            json={
+                "Name": name,
+                "username": name,
+                "email_id": account["email_id"],
+                "ph_no": 1234567890,
+                "password1": PASSWORD,
+                "password2": PASSWORD,
+            },
+        )
+        if registered and await self.call(
+            client, JOURNEYS["enroll"][1], files=self.upload()
+        ):
+            self.accounts.append(account)
+
+    async def login(self, client) -> None:
+        if not self.accounts:
+            await self.enroll(client)
+            return
+        account = random.choice(self.accounts)
+        if await self.call(client, JOURNEYS["login"][0], json=account):
+            await self.call(client, JOURNEYS["login"][1], files=self.upload())
+
+    async def virtual_user(self, stop_at: float) -> None:
+        import httpx
+
+        async with httpx.AsyncClient(base_url=self.base_url, timeout=120) as client:
+            while time.monotonic() < stop_at:
+                client.cookies.clear()
+                journey = random.choices(self.journeys, self.weights)[0]
+                await getattr(self, journey)(client)
+
+    async def run(self, concurrency: int, duration: float, warmup: float) -> float:
+        # Run the warm-up unrecorded, then record for duration seconds.
+        start = time.monotonic()
+        users = [
+            asyncio.create_task(self.virtual_user(start + warmup + duration))
+            for _ in range(concurrency)
+        ]
+        await asyncio.sleep(warmup)
+        self.recording = True
+        recorded_from = time.monotonic()
+        await asyncio.gather(*users)
+        self.recording = False
+        return time.monotonic() - recorded_from
+
+    def report(self, elapsed: float) -> dict:
+        endpoints = {}
+        for endpoint, samples in sorted(self.latencies.items()):
+            samples_ms = np.asarray(samples) * 1000
+            endpoints[endpoint] = {
+                "requests": len(samples),
+                "errors": self.errors[endpoint],
+                "error_rate": self.errors[endpoint] / len(samples),
+                "throughput_rps": len(samples) / elapsed,
+                "mean_ms": float(samples_ms.mean()),
+                "p50_ms": float(np.percentile(samples_ms, 50)),
+                "p95_ms": float(np.percentile(samples_ms, 95)),
+                "p99_ms": float(np.percentile(samples_ms, 99)),
+            }
+        requests = sum(result["requests"] for result in endpoints.values())
+        errors = sum(result["errors"] for result in endpoints.values())
+        return {
+            "elapsed_s": elapsed,
+            "requests": requests,
+            "errors": errors,
+            "error_rate": errors / requests if requests else 0.0,
+            "throughput_rps": requests / elapsed,
+            "endpoints": endpoints,
+        }
+
+
+def parse_mix(value: str) -> dict:
+    mix = {}
+    for item in value.split(","):
+        journey, weight = item.split("=")
+        if journey not in JOURNEYS:
+            raise argparse.ArgumentTypeError(f"Unknown journey: {journey}")
+        mix[journey] = float(weight)
+    return mix
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="End-to-end load test.")
+    parser.add_argument("--mode", choices=("inprocess", "uvicorn"), default="inprocess")
+    parser.add_argument("--url", help="Target a running server instead.")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--stub-model", action="store_true")
+    parser.add_argument("--mongodb-url", help="MongoDB of the started server.")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--warmup", type=float, default=5)
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("enroll=1,login=4"))
+    parser.add_argument("--frames", type=int, default=3, help="Images per upload.")
+    parser.add_argument("--image", help="Face image uploaded as every frame.")
+    parser.add_argument(
+        "--repeat-frames",
+        action="store_true",
+        help="Upload identical bytes so repeated frames hit the image cache.",
+    )
+    parser.add_argument("--ready-timeout", type=float, default=300)
+    parser.add_argument("--output", default="loadtest.json")
+    args = parser.parse_args()
+
+    if args.image:
+        with open(args.image, "rb") as image_file:
+            frame = image_file.read()
+    else:
+        frame = face_bytes()
+
+    if args.mongodb_url:
+        # The uvicorn workers import benchmarks again, which reads this variable.
+        os.environ["BENCHMARK_MONGODB_URL"] = args.mongodb_url
+        os.environ["MONGODB_URL_KEY"] = args.mongodb_url
+
+    stop = None
+    base_url = args.url
+    if base_url is None:
+        base_url, stop = start_server(args.mode, args.workers, args.stub_model)
+    try:
+        asyncio.run(wait_until_ready(base_url, args.ready_timeout))
+        load_test = LoadTest(
+            base_url, args.mix, [frame] * args.frames, args.repeat_frames
+        )
+        elapsed = asyncio.run(
+            load_test.run(args.concurrency, args.duration, args.warmup)
+        )
+    finally:
+        if stop is not None:
+            stop()
+
+    report = load_test.report(elapsed)
+    report["config"] = {
+        "mode": "url" if args.url else args.mode,
+        "workers": args.workers,
+        "stub_model": args.stub_model,
+        "concurrency": args.concurrency,
+        "duration_s": args.duration,
+        "mix": args.mix,
+        "frames": args.frames,
+        "repeat_frames": args.repeat_frames,
+    }
+    with open(args.output, "w") as report_file:
+        json.dump(report, report_file, indent=2, sort_keys=True)
+
+    for endpoint, result in report["endpoints"].items():
+        print(
+            f"{endpoint:40s} {result['throughput_rps']:8.2f} req/s  "
+            f"p50 {result['p50_ms']:8.1f} ms  p95 {result['p95_ms']:8.1f} ms  "
+            f"p99 {result['p99_ms']:8.1f} ms  errors {result['error_rate']:.1%}"
+        )
+    print(
+        f"{'total':40s} {report['throughput_rps']:8.2f} req/s  "
+        f"errors {report['error_rate']:.1%}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+import json
+import time
+import numpy as np
+from typing import Callable, Dict, List
+
+
+def measure(fn: Callable, repeat: int = 20, warmup: int = 2) -> dict:
+    # Time repeated calls of fn and summarise them in milliseconds.
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    samples_ms = np.asarray(samples) * 1000
+    return {
+        "repeat": repeat,
+        "mean_ms": float(samples_ms.mean()),
+        "min_ms": float(samples_ms.min()),
+        "p50_ms": float(np.percentile(samples_ms, 50)),
+        "p95_ms": float(np.percentile(samples_ms, 95)),
+    }
+
+
+def save_results(results: Dict[str, dict], file_path: str) -> None:
+    with open(file_path, "w") as result_file:
+        json.dump(results, result_file, indent=2, sort_keys=True)
+
+
+def load_results(file_path: str) -> Dict[str, dict]:
+    with open(file_path) as result_file:
+        return json.load(result_file)
+
+
+def compare_results(
+    results: Dict[str, dict],
+    baseline: Dict[str, dict],
+    tolerance: float = 0.2,
+    metric: str = "p50_ms",
+) -> List[str]:
+    # Return a message for every benchmark slower than its baseline by more than tolerance.
+    regressions = []
+    for name, result in sorted(results.items()):
+        if name not in baseline:
+            continue
+        before, after = baseline[name][metric], result[metric]
+        if after > before * (1 + tolerance):
+            regressions.append(
+                f"{name}: {metric} {after:.3f} > baseline {before:.3f} (+{tolerance:.0%})"
+            )
+    return regressions
@@ -1,11 +1,29 @@
 import os
+import asyncio
+import time
 from typing import List
-from fastapi import APIRouter, File, Request
+from fastapi import (
+    APIRouter,
+    File,
+    HTTPException,
+    Query,
+    Request,
+    WebSocket,
+    WebSocketDisconnect,
+)
 from starlette import status
 from starlette.responses import JSONResponse, RedirectResponse
+from starlette.websockets import WebSocketState
 
 from controller.auth_controller.authentication import get_current_user
+from faceapp.exception import InferenceQueueFullError
+from faceapp.inference.executor import inference_executor
+from faceapp.metrics import OUTCOMES, is_face_not_detected, is_invalid_image
+from faceapp.constant import IDENTIFICATION_TOP_K, STREAM_MAX_FRAMES, STREAM_TIMEOUT
+from faceapp.data_access.async_user_embedding_data import AsyncUserEmbeddingData
+from faceapp.inference.face_detector import FaceTrack, cascade_face_detector
 from faceapp.user.user_embedding_val import (
+    UserIdentificationValidation,
     UserLoginEmbeddingValidation,
     UserRegisterEmbeddingValidation,
 )
@@ -29,22 +47,56 @@ async def login_embedding(
         if user is None:
             return RedirectResponse(url="/auth", status_code=status.HTTP_302_FOUND)
 
-        user_embedding_validation = UserLoginEmbeddingValidation(user["uuid"])
+        user_embedding = await AsyncUserEmbeddingData().get_user_embedding(user["uuid"])
+
+        if user_embedding is None:
+            return JSONResponse(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                content={"status": False, "message": "User NOT Authenticated"},
+            )
+
+        user_embedding_validation = UserLoginEmbeddingValidation(
+            user["uuid"], user_embedding
+        )
 
         # Compare Embeddings.
-        user_simmilariy_status = user_embedding_validation.compare_embedding(files)
+        verification = await inference_executor.run(
+            user_embedding_validation.verify, files
+        )
 
-        if user_simmilariy_status:
+        if verification["status"]:
             return JSONResponse(
                 status_code=status.HTTP_200_OK,
-                content={"status": True, "message": "User Authenticated"},
+                content={
+                    "status": True,
+                    "message": "User Authenticated",
+                    "frames_used": verification["frames_used"],
+                },
             )
         else:
             return JSONResponse(
                 status_code=status.HTTP_401_UNAUTHORIZED,
-                content={"status": False, "message": "User NOT Authenticated"},
+                content={
+                    "status": False,
+                    "message": "User NOT Authenticated",
+                    "frames_used": verification["frames_used"],
+                },
             )
 
+    except InferenceQueueFullError:
+        OUTCOMES.labels("login", "busy").inc()
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": False, "message": "Server Busy, Please Retry"},
+        )
+
+    except asyncio.TimeoutError:
+        OUTCOMES.labels("login", "timeout").inc()
+        return JSONResponse(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            content={"status": False, "message": "Face Verification Timed Out"},
+        )
+
     except Exception as e:
         return JSONResponse(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -55,6 +107,161 @@ async def login_embedding(
         )
 
 
+async def send_stream_error(websocket: WebSocket, message: str, code: int) -> None:
+    # The client may already have gone away; only a connected stream gets the error.
+    if websocket.client_state == WebSocketState.CONNECTED:
+        await websocket.send_json({"type": "error", "message": message})
+        await websocket.close(code=code)
+
+
+@router.websocket("/stream")
+async def stream_login(websocket: WebSocket):
+    # Score camera frames as they arrive and close with the decision once it is confident.
+    # Clients send each frame as a binary message and may send "end" to decide early.
+    try:
+        user = await get_current_user(websocket)
+    except HTTPException:
+        user = None
+
+    if not isinstance(user, dict):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    try:
+        user_embedding = await AsyncUserEmbeddingData().get_user_embedding(user["uuid"])
+        user_embedding_validation = UserLoginEmbeddingValidation(
+            user["uuid"], user_embedding or {"UUID": None}
+        )
+
+        if not user_embedding_validation.validate():
+            await websocket.send_json(
+                {
+                    "type": "decision",
+                    "status": False,
+                    "message": "User NOT Authenticated",
+                    "frames_used": 0,
+                }
+            )
+            await websocket.close()
+            return
+
+        decision = user_embedding_validation.start_decision()
+        regions = []
+        track = FaceTrack()
+        frames = 0
+        # Like the frames of one HTTP login, the stream shares one detector latency
+        # budget, spent only while its frames are processed.
+        budget = cascade_face_detector.latency_budget
+        deadline = time.monotonic() + STREAM_TIMEOUT
+        while not decision.confident and frames < STREAM_MAX_FRAMES:
+            # Decide on the frames received so far once the stream runs out of time.
+            try:
+                message = await asyncio.wait_for(
+                    websocket.receive(), max(deadline - time.monotonic(), 0)
+                )
+            except asyncio.TimeoutError:
+                break
+
+            if message["type"] == "websocket.disconnect":
+                OUTCOMES.labels("login", "disconnected").inc()
+                return
+            if message.get("text") == "end":
+                break
+            if not message.get("bytes"):
+                continue
+
+            # Embed the frame; a frame without a face or an undecodable frame is
+            # reported and skipped.
+            frames += 1
+            skipped = False
+            frame_start = time.perf_counter()
+            try:
+                embedding, region = await inference_executor.run(
+                    UserLoginEmbeddingValidation.embed_frame,
+                    message["bytes"],
+                    frame_start + max(budget, 0),
+                    track,
+                )
+                decision.add(embedding, region is not None)
+            except Exception as e:
+                if is_invalid_image(e):
+                    skipped, region = True, None
+                elif is_face_not_detected(e):
+                    region = None
+                else:
+                    raise
+            budget -= time.perf_counter() - frame_start
+            if not skipped:
+                regions.append(region)
+
+            await websocket.send_json(
+                {
+                    "type": "score",
+                    "score": decision.score,
+                    "frames_used": decision.frames_used,
+                    "face_found": region is not None,
+                    "skipped": skipped,
+                }
+            )
+
+        if not regions:
+            # Nothing to decide on: the stream ended before a decodable frame arrived.
+            OUTCOMES.labels("login", "no_frames").inc()
+            await websocket.send_json(
+                {
+                    "type": "decision",
+                    "status": False,
+                    "message": "No Frames Received",
+                    "score": None,
+                    "frames_used": 0,
+                }
+            )
+            await websocket.close()
+            return
+
+        verification = await inference_executor.run(
+            user_embedding_validation.conclude, decision, regions
+        )
+        await websocket.send_json(
+            {
+                "type": "decision",
+                "status": verification["status"],
+                "message": (
+                    "User Authenticated"
+                    if verification["status"]
+                    else "User NOT Authenticated"
+                ),
+                "score": verification["score"],
+                "frames_used": verification["frames_used"],
+            }
+        )
+        await websocket.close()
+
+    except InferenceQueueFullError:
+        OUTCOMES.labels("login", "busy").inc()
+        await send_stream_error(
+            websocket, "Server Busy, Please Retry", status.WS_1013_TRY_AGAIN_LATER
+        )
+
+    except asyncio.TimeoutError:
+        OUTCOMES.labels("login", "timeout").inc()
+        await send_stream_error(
+            websocket, "Face Verification Timed Out", status.WS_1011_INTERNAL_ERROR
+        )
+
+    except WebSocketDisconnect:
+        OUTCOMES.labels("login", "disconnected").inc()
+
+    except Exception as e:
+        OUTCOMES.labels("login", "error").inc()
+        await send_stream_error(
+            websocket,
+            "Error in Login Embedding in Database",
+            status.WS_1011_INTERNAL_ERROR,
+        )
+
+
 @router.post("/register_embedding")
 async def register_embedding(
     request: Request, files: List[bytes] = File(description="Upload Multiple Files")
@@ -66,10 +273,16 @@ async def register_embedding(
         if uuid is None:
             return RedirectResponse(url="/auth", status_code=status.HTTP_302_FOUND)
 
-        user_embedding_validation = UserRegisterEmbeddingValidation(uuid)
+        # Generate the Embeddings.
+        user_embedding, templates = await inference_executor.run(
+            UserRegisterEmbeddingValidation.generate_user_embedding, files
+        )
 
         # Save the Embeddings.
-        user_embedding_validation.save_embedding(files)
+        await AsyncUserEmbeddingData().save_user_embedding(
+            uuid, user_embedding, templates
+        )
+        OUTCOMES.labels("registration", "stored").inc()
 
         return JSONResponse(
             status_code=status.HTTP_200_OK,
@@ -80,7 +293,23 @@ async def register_embedding(
             headers={"uuid": uuid},
         )
 
+    except InferenceQueueFullError:
+        OUTCOMES.labels("registration", "busy").inc()
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": False, "message": "Server Busy, Please Retry"},
+        )
+
+    except asyncio.TimeoutError:
+        OUTCOMES.labels("registration", "timeout").inc()
+        return JSONResponse(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            content={"status": False, "message": "Face Verification Timed Out"},
+        )
+
     except Exception as e:
+        outcome = "no_face" if is_face_not_detected(e) else "error"
+        OUTCOMES.labels("registration", outcome).inc()
         return JSONResponse(
             status_code=status.HTTP_404_NOT_FOUND,
             content={
@@ -88,3 +317,57 @@ async def register_embedding(
                 "message": "Error in Storing Embedding in Database",
             },
         )
+
+
+@router.post("/identify")
+async def identify_user(
+    request: Request,
+    files: List[bytes] = File(description="Upload Multiple Files"),
+    top_k: int = Query(IDENTIFICATION_TOP_K, ge=1, le=100),
+):
+    try:
+        # Identification reveals who is enrolled, so it needs a logged-in user.
+        user = await get_current_user(request)
+
+        if user is None:
+            return RedirectResponse(url="/auth", status_code=status.HTTP_302_FOUND)
+
+        user_identification_validation = await inference_executor.run(
+            UserIdentificationValidation, top_k
+        )
+
+        # Search the enrolled users.
+        matches = await inference_executor.run(
+            user_identification_validation.identify, files
+        )
+
+        identified = bool(matches) and matches[0]["matched"]
+        OUTCOMES.labels(
+            "identification", "identified" if identified else "unknown"
+        ).inc()
+
+        return JSONResponse(
+            status_code=status.HTTP_200_OK,
+            content={"status": identified, "matches": matches},
+        )
+
+    except InferenceQueueFullError:
+        OUTCOMES.labels("identification", "busy").inc()
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": False, "message": "Server Busy, Please Retry"},
+        )
+
+    except asyncio.TimeoutError:
+        OUTCOMES.labels("identification", "timeout").inc()
+        return JSONResponse(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            content={"status": False, "message": "Face Identification Timed Out"},
+        )
+
+    except Exception as e:
+        OUTCOMES.labels("identification", "error").inc()
+        return JSONResponse(
+            status_code=status.HTTP_404_NOT_FOUND,
+            content={"status": False, "message": "Error in Identifying User"},
+        )
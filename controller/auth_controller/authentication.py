@@ -1,3 +1,4 @@
+import asyncio
 from typing import Optional
 from jose import jwt, JWTError
 from datetime import datetime, timedelta
@@ -6,6 +7,7 @@ from starlette.responses import JSONResponse, RedirectResponse
 from fastapi import HTTPException, status, APIRouter, Request, Response
 
 from faceapp.entity.user import User
+from faceapp.exception import InferenceQueueFullError
 from faceapp.user.user_val import RegisterValidation, LoginValidation
 from faceapp.constant import SECRET_KEY, ALGORITHM
 
@@ -81,7 +83,7 @@ def create_access_token(
 async def login_for_access_token(response: Response, login) -> dict:
     try:
         user_validation = LoginValidation(login.email_id, login.password)
-        user: Optional[str] = user_validation.authenticate_user_login()
+        user: Optional[str] = await user_validation.authenticate_user_login()
 
         if not user:
             return {"status": False, "uuid": None, "response": response}
@@ -93,6 +95,9 @@ async def login_for_access_token(response: Response, login) -> dict:
         response.set_cookie(key="access_token", value=token, httponly=True)
         return {"status": True, "uuid": user["UUID"], "response": response}
 
+    except (InferenceQueueFullError, asyncio.TimeoutError):
+        raise
+
     except Exception as e:
         response = JSONResponse(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -133,6 +138,12 @@ async def login(request: Request, login: Login):
             content={"status": False, "message": "UnKnown Error"},
         )
 
+    except (InferenceQueueFullError, asyncio.TimeoutError):
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": False, "message": "Server Busy, Please Retry"},
+        )
+
     except Exception as e:
         return JSONResponse(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -168,7 +179,7 @@ async def register_user(request: Request, register: Register):
         # Validation of the user input data to check the format of the data.
         user_registration = RegisterValidation(user)
 
-        validate_regitration = user_registration.validate_registration()
+        validate_regitration = await user_registration.validate_registration()
 
         if not validate_regitration["status"]:
             msg = validate_regitration["msg"]
@@ -178,7 +189,13 @@ async def register_user(request: Request, register: Register):
             )
 
         # Save the user if the validation is successful.
-        validation_status = user_registration.authenticate_user_registration()
+        validation_status = await user_registration.authenticate_user_registration()
+
+        if not validation_status["status"]:
+            return JSONResponse(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                content={"status": False, "message": validation_status["msg"]},
+            )
 
         msg = "Registration Successful..... Please Login to continue"
         return JSONResponse(
@@ -187,6 +204,12 @@ async def register_user(request: Request, register: Register):
             headers={"uuid": user.uuid_},
         )
 
+    except (InferenceQueueFullError, asyncio.TimeoutError):
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": False, "message": "Server Busy, Please Retry"},
+        )
+
     except Exception as e:
         raise e
 
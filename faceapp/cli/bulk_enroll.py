@@ -0,0 +1,455 @@
+"""
+Enroll users in bulk from a face dataset, either a directory with one folder
+of images per user (the folder name is the username) or a CSV manifest with
+the columns username, Name, email_id, ph_no, password and images, where images
+is a folder or ";"-separated image paths relative to the manifest.
+
+Embeddings and password hashes are computed in a process pool whose workers
+load the models once, and users and embeddings are written with batched
+bulk_write calls. Every written user is appended to the checkpoint file, so
+an interrupted import resumes where it stopped; a user written without its
+embedding, with the same username and email id, gets it on the next run.
+
+Users without a password, such as every user of a dataset directory, get a
+random one only when --credentials is given, and their username, email id
+and password are appended to that file. Running servers see the new users
+after their next identification index refresh (EMBEDDING_INDEX_REFRESH_SECONDS).
+
+Usage: python -m faceapp.cli.bulk_enroll DATASET [--email-domain DOMAIN]
+       [--workers N] [--batch-size 500] [--checkpoint FILE]
+       [--credentials FILE] [--report FILE]
+"""
+
+import argparse
+import csv
+import json
+import math
+import multiprocessing
+import os
+import secrets
+import sys
+import time
+import numpy as np
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Iterator
+from pymongo import InsertOne
+from pymongo.errors import BulkWriteError
+
+from faceapp.data_access.user_data import UserData
+from faceapp.data_access.user_embedding_data import UserEmbeddingData
+from faceapp.entity.user import User
+from faceapp.entity.user_embedding import Embedding
+from faceapp.exception import AppException
+from faceapp.inference.model_registry import ModelRegistry
+from faceapp.logger import logging
+from faceapp.metrics import is_face_not_detected
+from faceapp.user.image_preprocessing import ImagePreprocessing
+from faceapp.user.password_hashing import password_hasher
+from faceapp.user.template_matching import TemplateMatcher
+from faceapp.user.user_embedding_val import UserLoginEmbeddingValidation
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".webp")
+DUPLICATE_KEY_ERROR = 11000
+
+
+def list_images(folder: str) -> list:
+    return sorted(
+        entry.path
+        for entry in os.scandir(folder)
+        if entry.is_file() and entry.name.lower().endswith(IMAGE_EXTENSIONS)
+    )
+
+
+def read_dataset(path: str, email_domain: str) -> Iterator[dict]:
+    # Yield one record per user from a dataset directory or a CSV manifest.
+    if os.path.isdir(path):
+        for entry in sorted(os.scandir(path), key=lambda entry: entry.name):
+            if entry.is_dir():
+                yield {
+                    "username": entry.name,
+                    "Name": entry.name,
+                    "email_id": f"{entry.name}@{email_domain}",
+                    "ph_no": "",
+                    "password": "",
+                    "images": list_images(entry.path),
+                }
+        return
+
+    base_dir = os.path.dirname(os.path.abspath(path))
+    with open(path, newline="") as manifest:
+        for row in csv.DictReader(manifest):
+            username = row["username"].strip()
+            cell = (row.get("images") or "").strip()
+            if not cell:
+                # A blank cell would otherwise resolve to the manifest's own folder.
+                images = []
+            elif os.path.isdir(os.path.join(base_dir, cell)):
+                images = list_images(os.path.join(base_dir, cell))
+            else:
+                images = [
+                    os.path.join(base_dir, image.strip())
+                    for image in cell.split(";")
+                    if image.strip()
+                ]
+            yield {
+                "username": username,
+                "Name": row.get("Name") or username,
+                "email_id": row.get("email_id") or f"{username}@{email_domain}",
+                "ph_no": row.get("ph_no") or "",
+                "password": row.get("password") or "",
+                "images": images,
+            }
+
+
+def load_checkpoint(path: str) -> set:
+    # Usernames already written by a previous run; failed users are retried.
+    done = set()
+    if path and os.path.exists(path):
+        with open(path) as checkpoint:
+            for line in checkpoint:
+                entry = json.loads(line)
+                if entry["status"] in ("enrolled", "exists"):
+                    done.add(entry["username"])
+    return done
+
+
+def init_worker() -> None:
+    ModelRegistry.load()
+
+
+def enroll_record(record: dict) -> dict:
+    # Runs in a worker process: embed the images of one user and hash the password.
+    try:
+        face_list = []
+        for image_path in record["images"]:
+            with open(image_path, "rb") as image_file:
+                img_array = ImagePreprocessing.decode_image(image_file.read())
+            try:
+                # Offline enrollment always runs the full detector cascade.
+                face_list.append(
+                    UserLoginEmbeddingValidation.detect_faces(
+                        [img_array], deadline=math.inf
+                    )
+                )
+            except Exception as e:
+                if not is_face_not_detected(e):
+                    raise
+        if not face_list:
+            return {
+                "username": record["username"],
+                "status": "failed",
+                "reason": "no face detected",
+            }
+
+        embedding_list = UserLoginEmbeddingValidation.represent_faces(
+            np.concatenate(face_list)
+        )
+        generated = not record["password"]
+        password = secrets.token_urlsafe(12) if generated else record["password"]
+        user = User(
+            record["Name"],
+            record["username"],
+            record["email_id"],
+            record["ph_no"],
+            password,
+            password,
+        )
+        embedding = Embedding(
+            UUID=user.uuid_,
+            user_embed=UserLoginEmbeddingValidation.average_embedding(embedding_list),
+            templates=TemplateMatcher.select_templates(embedding_list),
+        )
+        return {
+            "username": record["username"],
+            "status": "embedded",
+            "images": len(face_list),
+            "user": {
+                "Name": user.Name,
+                "username": user.username,
+                "password": password_hasher.hash_sync(password),
+                "email_id": user.email_id,
+                "ph_no": user.ph_no,
+                "UUID": user.uuid_,
+            },
+            "embedding": embedding.to_document(),
+            "generated_password": password if generated else None,
+        }
+
+    except Exception as e:
+        return {"username": record["username"], "status": "failed", "reason": str(e)}
+
+
+class BulkEnrollment:
+    """
+    Buffers the worker results and writes them in batches: the users first,
+    then the embeddings of the users that were inserted and of existing users
+    left without one by an interrupted run. Generated passwords are appended
+    to the credentials file as soon as their users are written, and every
+    outcome to the checkpoint file once its batch is written.
+    """
+
+    def __init__(
+        self, batch_size: int, checkpoint_path: str = None, credentials_path: str = None
+    ) -> None:
+        self.batch_size = batch_size
+        self.user_collection = UserData().collection
+        self.embedding_collection = UserEmbeddingData().collection
+        self.checkpoint = open(checkpoint_path, "a") if checkpoint_path else None
+        self.credentials = None
+        if credentials_path:
+            # Plain-text passwords: readable by the owner only.
+            self.credentials = open(
+                os.open(
+                    credentials_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o600
+                ),
+                "a",
+                newline="",
+            )
+        self.pending = []
+        self.report = {
+            "enrolled": 0,
+            "exists": 0,
+            "failed": 0,
+            "skipped": 0,
+            "images": 0,
+        }
+
+    def add(self, result: dict) -> None:
+        if result["status"] == "failed":
+            logging.info(
+                f"Bulk Enrollment Failed for {result['username']}: {result['reason']}"
+            )
+            self.record([result])
+            return
+        self.pending.append(result)
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self.pending:
+            return
+        pending, self.pending = self.pending, []
+        errors = {}
+        try:
+            self.user_collection.bulk_write(
+                [InsertOne(result["user"]) for result in pending], ordered=False
+            )
+        except BulkWriteError as e:
+            errors = {error["index"]: error for error in e.details["writeErrors"]}
+
+        inserted = [
+            result for index, result in enumerate(pending) if index not in errors
+        ]
+        self.write_credentials(inserted)
+        duplicates = [
+            result
+            for index, result in enumerate(pending)
+            if errors.get(index, {}).get("code") == DUPLICATE_KEY_ERROR
+        ]
+        resumed = self.without_embedding(duplicates)
+
+        embedding_errors = {}
+        to_embed = inserted + resumed
+        if to_embed:
+            try:
+                self.embedding_collection.bulk_write(
+                    [InsertOne(result["embedding"]) for result in to_embed],
+                    ordered=False,
+                )
+            except BulkWriteError as e:
+                embedding_errors = {
+                    id(to_embed[error["index"]]): error
+                    for error in e.details["writeErrors"]
+                }
+
+        embedded = {id(result) for result in to_embed}
+        for index, result in enumerate(pending):
+            if id(result) in embedding_errors:
+                # The user is kept, so a rerun finds it without an embedding and resumes it.
+                error = embedding_errors[id(result)]
+                result["status"], result["reason"] = "failed", error["errmsg"]
+            elif id(result) in embedded:
+                result["status"] = "enrolled"
+                self.report["images"] += result["images"]
+            elif errors[index]["code"] == DUPLICATE_KEY_ERROR:
+                result["status"] = "exists"
+            else:
+                result["status"], result["reason"] = "failed", errors[index]["errmsg"]
+        self.record(pending)
+
+    def without_embedding(self, duplicates: list) -> list:
+        # Users a previous run wrote without their embedding, matched on both the
+        # username and the email id; their embedding takes the stored UUID.
+        if not duplicates:
+            return []
+        stored = {
+            (user["username"], user["email_id"]): user["UUID"]
+            for user in self.user_collection.find(
+                {"username": {"$in": [result["username"] for result in duplicates]}},
+                {"username": 1, "email_id": 1, "UUID": 1},
+            )
+        }
+        matched = {}
+        for result in duplicates:
+            uuid_ = stored.get((result["user"]["username"], result["user"]["email_id"]))
+            if uuid_ is not None:
+                matched[uuid_] = result
+        embedded = {
+            embedding["UUID"]
+            for embedding in self.embedding_collection.find(
+                {"UUID": {"$in": list(matched)}}, {"UUID": 1}
+            )
+        }
+        resumed = []
+        for uuid_, result in matched.items():
+            if uuid_ not in embedded:
+                result["embedding"] = {**result["embedding"], "UUID": uuid_}
+                resumed.append(result)
+        return resumed
+
+    def write_credentials(self, results: list) -> None:
+        rows = [
+            (
+                result["username"],
+                result["user"]["email_id"],
+                result["generated_password"],
+            )
+            for result in results
+            if result.get("generated_password")
+        ]
+        if not rows:
+            return
+        csv.writer(self.credentials).writerows(rows)
+        self.credentials.flush()
+        os.fsync(self.credentials.fileno())
+
+    def record(self, results: list) -> None:
+        for result in results:
+            self.report[result["status"]] += 1
+        if self.checkpoint is None:
+            return
+        for result in results:
+            entry = {"username": result["username"], "status": result["status"]}
+            if "reason" in result:
+                entry["reason"] = result["reason"]
+            self.checkpoint.write(json.dumps(entry) + "\n")
+        self.checkpoint.flush()
+        os.fsync(self.checkpoint.fileno())
+
+    def close(self) -> None:
+        self.flush()
+        for output in (self.checkpoint, self.credentials):
+            if output is not None:
+                output.close()
+
+
+def bulk_enroll(
+    dataset: str,
+    email_domain: str = "example.com",
+    workers: int = os.cpu_count() or 1,
+    batch_size: int = 500,
+    checkpoint_path: str = None,
+    credentials_path: str = None,
+) -> dict:
+    try:
+        # Split the cores between the workers so their inference threads do not oversubscribe.
+        threads = str(max(1, (os.cpu_count() or 1) // workers))
+        for name in ("TF_NUM_INTRAOP_THREADS", "ONNX_INTRA_OP_THREADS"):
+            os.environ.setdefault(name, threads)
+        os.environ.setdefault("TF_NUM_INTEROP_THREADS", "1")
+
+        UserData().create_indexes()
+        done = load_checkpoint(checkpoint_path)
+        enrollment = BulkEnrollment(batch_size, checkpoint_path, credentials_path)
+        start = time.perf_counter()
+
+        # Spawned workers import TensorFlow themselves instead of inheriting a forked copy.
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_worker,
+        ) as pool:
+            # Keep a bounded number of users in flight so large datasets stream through.
+            in_flight = set()
+            for record in read_dataset(dataset, email_domain):
+                if record["username"] in done:
+                    enrollment.report["skipped"] += 1
+                    continue
+                if not record["images"]:
+                    enrollment.add(
+                        {
+                            "username": record["username"],
+                            "status": "failed",
+                            "reason": "no images",
+                        }
+                    )
+                    continue
+                if not record["password"] and not credentials_path:
+                    enrollment.add(
+                        {
+                            "username": record["username"],
+                            "status": "failed",
+                            "reason": "no password; pass --credentials to generate one",
+                        }
+                    )
+                    continue
+                in_flight.add(pool.submit(enroll_record, record))
+                if len(in_flight) >= workers * 4:
+                    finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        enrollment.add(future.result())
+            for future in wait(in_flight).done:
+                enrollment.add(future.result())
+        enrollment.close()
+
+        report = enrollment.report
+        elapsed = time.perf_counter() - start
+        report["elapsed_s"] = round(elapsed, 3)
+        report["users_per_s"] = round(report["enrolled"] / elapsed, 3)
+        report["images_per_s"] = round(report["images"] / elapsed, 3)
+        logging.info(f"Bulk Enrollment Finished: {report}")
+        return report
+
+    except Exception as e:
+        raise AppException(e, sys) from e
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Enroll users from a face dataset.")
+    parser.add_argument("dataset", help="Dataset directory or CSV manifest.")
+    parser.add_argument(
+        "--email-domain",
+        default="example.com",
+        help="Domain of the email ids derived from usernames.",
+    )
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--checkpoint", help="Checkpoint file used to resume.")
+    parser.add_argument(
+        "--credentials",
+        help="Generate passwords for users without one and append them to this CSV.",
+    )
+    parser.add_argument("--report", help="Write the throughput report as JSON.")
+    args = parser.parse_args()
+
+    report = bulk_enroll(
+        args.dataset,
+        email_domain=args.email_domain,
+        workers=args.workers,
+        batch_size=args.batch_size,
+        checkpoint_path=args.checkpoint,
+        credentials_path=args.credentials,
+    )
+    if args.report:
+        with open(args.report, "w") as report_file:
+            json.dump(report, report_file, indent=2)
+    print(
+        f"Enrolled {report['enrolled']} users ({report['images']} images) in "
+        f"{report['elapsed_s']:.1f} s: {report['users_per_s']:.2f} users/s, "
+        f"{report['images_per_s']:.2f} images/s. {report['exists']} already "
+        f"existed, {report['failed']} failed, {report['skipped']} skipped."
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Export the locally cached Facenet and MTCNN Keras models to ONNX for the
+onnx inference backend, and check that both backends agree.
+
+Requires tf2onnx for the export and onnxruntime for the check.
+
+Usage: python -m faceapp.cli.export_onnx [--output-dir DIR] [--opset 13]
+       [--check] [--image face.jpg] [--tolerance 1e-4]
+"""
+
+import argparse
+import os
+import sys
+import numpy as np
+
+from faceapp.constant import EMBEDDING_MODEL_NAME, ONNX_MODEL_DIR
+from faceapp.exception import AppException
+from faceapp.inference.onnx_backend import (
+    MTCNN_NETWORKS,
+    OnnxModel,
+    build_onnx_mtcnn,
+    onnx_model_path,
+)
+from faceapp.logger import logging
+
+
+def export_keras_model(model, output_path: str, opset: int) -> str:
+    # Keep the batch and spatial dimensions the Keras model leaves open dynamic.
+    import tensorflow as tf
+    import tf2onnx
+
+    input_signature = [
+        tf.TensorSpec(model_input.shape, tf.float32, name="input")
+        for model_input in model.inputs
+    ]
+    # tf2onnx's own graph optimizers exhaust memory on Facenet's weights; ONNX
+    # Runtime applies its graph optimizations when the session is created instead.
+    tf2onnx.convert.from_keras(
+        model,
+        input_signature=input_signature,
+        opset=opset,
+        output_path=output_path,
+        optimizers={},
+    )
+    logging.info(f"Exported ONNX Model: {output_path}")
+    return output_path
+
+
+def export_models(output_dir: str = ONNX_MODEL_DIR, opset: int = 13) -> list:
+    try:
+        from deepface import DeepFace
+        from mtcnn import MTCNN
+
+        os.makedirs(output_dir, exist_ok=True)
+        exported = [
+            export_keras_model(
+                DeepFace.build_model(EMBEDDING_MODEL_NAME),
+                onnx_model_path(EMBEDDING_MODEL_NAME, output_dir),
+                opset,
+            )
+        ]
+        mtcnn = MTCNN()
+        for network in MTCNN_NETWORKS:
+            exported.append(
+                export_keras_model(
+                    getattr(mtcnn, f"_{network}"),
+                    onnx_model_path(f"mtcnn_{network}", output_dir),
+                    opset,
+                )
+            )
+        return exported
+
+    except Exception as e:
+        raise AppException(e, sys) from e
+
+
+def check_parity(
+    output_dir: str = ONNX_MODEL_DIR, image_path: str = None, batch_size: int = 8
+) -> dict:
+    # Compare Facenet embeddings on a random batch and MTCNN detections on an image.
+    try:
+        from deepface import DeepFace
+        from mtcnn import MTCNN
+        from PIL import Image
+
+        keras_model = DeepFace.build_model(EMBEDDING_MODEL_NAME)
+        onnx_model = OnnxModel(onnx_model_path(EMBEDDING_MODEL_NAME, output_dir))
+        input_shape = tuple(keras_model.inputs[0].shape[1:])
+        batch = np.random.default_rng(0).standard_normal(
+            (batch_size,) + input_shape, dtype=np.float32
+        )
+        keras_embeddings = keras_model.predict(batch, verbose=0)
+        onnx_embeddings = onnx_model.predict(batch)
+        cosine = np.sum(keras_embeddings * onnx_embeddings, axis=1) / (
+            np.linalg.norm(keras_embeddings, axis=1)
+            * np.linalg.norm(onnx_embeddings, axis=1)
+        )
+        report = {
+            "embedding_max_abs_diff": float(
+                np.abs(keras_embeddings - onnx_embeddings).max()
+            ),
+            "embedding_min_cosine": float(cosine.min()),
+        }
+
+        if image_path is not None:
+            img_array = np.asarray(Image.open(image_path).convert("RGB"))
+            keras_faces = MTCNN().detect_faces(img_array)
+            onnx_faces = build_onnx_mtcnn(output_dir).detect_faces(img_array)
+            report["detections"] = [len(keras_faces), len(onnx_faces)]
+            if keras_faces and onnx_faces and len(keras_faces) == len(onnx_faces):
+                report["box_max_abs_diff"] = float(
+                    np.abs(
+                        np.array([face["box"] for face in keras_faces])
+                        - np.array([face["box"] for face in onnx_faces])
+                    ).max()
+                )
+        logging.info(f"ONNX Parity Check: {report}")
+        return report
+
+    except Exception as e:
+        raise AppException(e, sys) from e
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export the face models to ONNX.")
+    parser.add_argument("--output-dir", default=ONNX_MODEL_DIR)
+    parser.add_argument("--opset", type=int, default=13)
+    parser.add_argument(
+        "--check", action="store_true", help="Only compare the exported models."
+    )
+    parser.add_argument("--image", help="Face image for the MTCNN parity check.")
+    parser.add_argument(
+        "--tolerance", type=float, default=1e-4, help="Allowed 1 - cosine similarity."
+    )
+    args = parser.parse_args()
+
+    if not args.check:
+        for output_path in export_models(args.output_dir, args.opset):
+            print(f"Exported {output_path}")
+
+    report = check_parity(args.output_dir, args.image)
+    print(report)
+    detections = report.get("detections", [0, 0])
+    if (
+        1 - report["embedding_min_cosine"] > args.tolerance
+        or detections[0] != detections[1]
+        or report.get("box_max_abs_diff", 0) > 1
+    ):
+        print("ONNX outputs do not match the Keras models.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
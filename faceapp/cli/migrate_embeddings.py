@@ -0,0 +1,115 @@
+"""
+Rewrite legacy embedding documents, stored as BSON arrays of doubles, and
+documents packed in another dtype into packed Binary of the target dtype
+(EMBEDDING_DTYPE by default) with a model and version tag.
+
+Embeddings cannot be recomputed without the enrollment images, so documents of
+an older EMBEDDING_VERSION keep their version and are only counted: those users
+have to register their face again.
+
+Usage: python -m faceapp.cli.migrate_embeddings [--batch-size 1000] [--dry-run]
+       [--dtype {float32,float16,int8}]
+"""
+
+import argparse
+import sys
+from pymongo import UpdateOne
+
+from faceapp.config.database import MONGOMOCK_URL_PREFIX
+from faceapp.constant import EMBEDDING_DTYPE, EMBEDDING_VERSION, MONGODB_URL_KEY
+from faceapp.data_access.embedding_quantization import STORAGE_DTYPES
+from faceapp.data_access.user_embedding_data import UserEmbeddingData
+from faceapp.entity.user_embedding import Embedding
+from faceapp.exception import AppException
+from faceapp.logger import logging
+
+
+def migrate_embeddings(
+    batch_size: int = 1000, dry_run: bool = False, dtype: str = EMBEDDING_DTYPE
+) -> dict:
+    try:
+        collection = UserEmbeddingData().collection
+        cursor = collection.find(
+            {
+                "$or": [
+                    {"user_embed": {"$type": "array"}},
+                    {"embed_dtype": {"$ne": dtype}},
+                    {"templates": {"$exists": True}, "template_dtype": {"$ne": dtype}},
+                ]
+            }
+        ).batch_size(batch_size)
+
+        report = {"scanned": 0, "migrated": 0}
+        updates = []
+        for document in cursor:
+            report["scanned"] += 1
+            embedding = Embedding.from_document(document)
+            embedding.embed_dtype = dtype
+            updates.append(
+                ({"_id": document["_id"]}, {"$set": embedding.to_document()})
+            )
+            if len(updates) >= batch_size:
+                report["migrated"] += flush(collection, updates, dry_run)
+                updates = []
+        report["migrated"] += flush(collection, updates, dry_run)
+
+        report["reenroll"] = collection.count_documents(
+            {
+                "$or": [
+                    {"embed_version": {"$exists": False}},
+                    {"embed_version": {"$lt": EMBEDDING_VERSION}},
+                ]
+            }
+        )
+        if report["reenroll"]:
+            logging.warning(
+                f"{report['reenroll']} Embeddings Predate Version {EMBEDDING_VERSION}, "
+                "Their Users Must Re-enroll."
+            )
+        logging.info(f"Embedding Migration Finished: {report}")
+        return report
+
+    except Exception as e:
+        raise AppException(e, sys) from e
+
+
+def flush(collection, updates: list, dry_run: bool) -> int:
+    # Apply the (filter, update) pairs and return the number of modified documents.
+    if not updates:
+        return 0
+    if dry_run:
+        return len(updates)
+    if MONGODB_URL_KEY.startswith(MONGOMOCK_URL_PREFIX):
+        # The in-process stand-in cannot run UpdateOne in bulk_write.
+        return sum(
+            collection.update_one(query, update).modified_count
+            for query, update in updates
+        )
+    operations = [UpdateOne(query, update) for query, update in updates]
+    return collection.bulk_write(operations, ordered=False).modified_count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Migrate stored embeddings to a packed dtype."
+    )
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument(
+        "--dtype", choices=sorted(STORAGE_DTYPES), default=EMBEDDING_DTYPE
+    )
+    args = parser.parse_args()
+
+    report = migrate_embeddings(
+        batch_size=args.batch_size, dry_run=args.dry_run, dtype=args.dtype
+    )
+    print(f"Scanned {report['scanned']} documents, migrated {report['migrated']}.")
+    if report["reenroll"]:
+        print(
+            f"{report['reenroll']} users enrolled before embedding version "
+            f"{EMBEDDING_VERSION} must register their face again."
+        )
+
+
+if __name__ == "__main__":
+    main()
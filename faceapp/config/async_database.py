@@ -0,0 +1,89 @@
+import functools
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from faceapp.config.database import (
+    MONGOMOCK_URL_PREFIX,
+    MongoDBClient,
+    get_client_options,
+)
+from faceapp.constant import DATABASE_NAME, MONGODB_URL_KEY
+
+
+class AsyncMockCursor:
+    """
+    Awaitable view of a mongomock cursor with the motor cursor interface.
+    """
+
+    def __init__(self, cursor) -> None:
+        self.cursor = cursor
+
+    def __getattr__(self, name):
+        return getattr(self.cursor, name)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self.cursor)
+        except StopIteration:
+            raise StopAsyncIteration
+
+    async def to_list(self, length=None) -> list:
+        documents = list(self.cursor)
+        return documents if length is None else documents[:length]
+
+
+class AsyncMockCollection:
+    """
+    Coroutine wrapper around a mongomock collection, shared with the sync client.
+    """
+
+    def __init__(self, collection) -> None:
+        self.collection = collection
+
+    def find(self, *args, **kwargs) -> AsyncMockCursor:
+        return AsyncMockCursor(self.collection.find(*args, **kwargs))
+
+    def __getattr__(self, name):
+        method = getattr(self.collection, name)
+
+        @functools.wraps(method)
+        async def wrapper(*args, **kwargs):
+            return method(*args, **kwargs)
+
+        return wrapper
+
+
+class AsyncMockClient:
+    def __init__(self, client) -> None:
+        self.client = client
+
+    def __getitem__(self, database_name: str):
+        return AsyncMockDatabase(self.client[database_name])
+
+
+class AsyncMockDatabase:
+    def __init__(self, database) -> None:
+        self.database = database
+
+    def __getitem__(self, collection_name: str) -> AsyncMockCollection:
+        return AsyncMockCollection(self.database[collection_name])
+
+
+class AsyncMongoDBClient:
+    client = None
+
+    def __init__(self, database_name=DATABASE_NAME) -> None:
+        if AsyncMongoDBClient.client is None:
+            mongo_db_url = MONGODB_URL_KEY
+            if mongo_db_url.startswith(MONGOMOCK_URL_PREFIX):
+                AsyncMongoDBClient.client = AsyncMockClient(MongoDBClient().client)
+            else:
+                AsyncMongoDBClient.client = AsyncIOMotorClient(
+                    mongo_db_url, **get_client_options(mongo_db_url)
+                )
+
+        self.client = AsyncMongoDBClient.client
+        self.database = self.client[database_name]
+        self.database_name = database_name
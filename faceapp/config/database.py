@@ -1,9 +1,36 @@
 import certifi
 import pymongo
-from faceapp.constant import DATABASE_NAME, MONGODB_URL_KEY
+from faceapp.constant import (
+    DATABASE_NAME,
+    MONGODB_CONNECT_TIMEOUT_MS,
+    MONGODB_MAX_POOL_SIZE,
+    MONGODB_MIN_POOL_SIZE,
+    MONGODB_READ_PREFERENCE,
+    MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+    MONGODB_SOCKET_TIMEOUT_MS,
+    MONGODB_URL_KEY,
+)
 
 ca = certifi.where()
 
+# URL scheme selecting the in-process mongomock stand-in for local runs.
+MONGOMOCK_URL_PREFIX = "mongomock://"
+
+
+def get_client_options(mongo_db_url: str) -> dict:
+    # Connection pool, timeout and read preference options shared by both clients.
+    options = {
+        "maxPoolSize": MONGODB_MAX_POOL_SIZE,
+        "minPoolSize": MONGODB_MIN_POOL_SIZE,
+        "serverSelectionTimeoutMS": MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+        "connectTimeoutMS": MONGODB_CONNECT_TIMEOUT_MS,
+        "socketTimeoutMS": MONGODB_SOCKET_TIMEOUT_MS,
+        "readPreference": MONGODB_READ_PREFERENCE,
+    }
+    if "localhost" not in mongo_db_url:
+        options["tlsCAFile"] = ca
+    return options
+
 
 class MongoDBClient:
     client = None
@@ -11,10 +38,14 @@ class MongoDBClient:
     def __init__(self, database_name=DATABASE_NAME) -> None:
         if MongoDBClient.client is None:
             mongo_db_url = MONGODB_URL_KEY
-            if "localhost" in mongo_db_url:
-                MongoDBClient.client = pymongo.MongoClient(mongo_db_url)
+            if mongo_db_url.startswith(MONGOMOCK_URL_PREFIX):
+                import mongomock
+
+                MongoDBClient.client = mongomock.MongoClient()
             else:
-                MongoDBClient.client = pymongo.MongoClient(mongo_db_url, tlsCAFile=ca)
+                MongoDBClient.client = pymongo.MongoClient(
+                    mongo_db_url, **get_client_options(mongo_db_url)
+                )
 
         self.client = MongoDBClient.client
         self.database = self.client[database_name]
@@ -0,0 +1,45 @@
+import os
+from dotenv import dotenv_values
+
+# Marks a setting without a default, which must be present in the environment.
+REQUIRED = object()
+
+
+class Settings:
+    """
+    Application settings, parsed once from the .env file with the process
+    environment taking precedence. Typed getters convert the raw strings and
+    fall back to the given default; a missing required setting raises KeyError.
+    """
+
+    def __init__(self, env_file: str = ".env") -> None:
+        self.values = {**dotenv_values(env_file), **os.environ}
+
+    def get_str(self, name: str, default=REQUIRED) -> str:
+        value = self.values.get(name)
+        if value is None:
+            if default is REQUIRED:
+                raise KeyError(name)
+            return default
+        return value
+
+    def get_int(self, name: str, default=REQUIRED) -> int:
+        return int(self.get_str(name, default))
+
+    def get_float(self, name: str, default=REQUIRED) -> float:
+        return float(self.get_str(name, default))
+
+    def get_bool(self, name: str, default=REQUIRED) -> bool:
+        value = self.get_str(name, default)
+        if isinstance(value, bool):
+            return value
+        return value.strip().lower() in ("1", "true", "yes", "on")
+
+    def get_list(self, name: str, default=REQUIRED) -> list:
+        value = self.get_str(name, default)
+        if isinstance(value, str):
+            value = [item.strip() for item in value.split(",") if item.strip()]
+        return list(value)
+
+
+settings = Settings()
@@ -1,27 +1,158 @@
 import os
 from datetime import datetime
-from faceapp.utils import CommonUtils
+from faceapp.config.settings import settings
 
 PIPELINE_NAME = "faceapp"
 PIPELINE_ARTIFACT_DIR = os.path.join(os.getcwd(), "artifact")
 TIMESTAMP = datetime.now().strftime("%Y%m%d_%H%M%S")
 
+# Logging Constants.
+LOG_LEVEL = settings.get_str("LOG_LEVEL", "INFO").upper()
+LOG_MAX_BYTES = settings.get_int("LOG_MAX_BYTES", 50 * 1024 * 1024)
+LOG_BACKUP_COUNT = settings.get_int("LOG_BACKUP_COUNT", 5)
+LOG_QUEUE_SIZE = settings.get_int("LOG_QUEUE_SIZE", 10000)
+# Share of requests whose INFO records are written; warnings are always kept.
+LOG_INFO_SAMPLE_RATE = settings.get_float("LOG_INFO_SAMPLE_RATE", 1.0)
+
 # Authentication Constants.
-SECRET_KEY = CommonUtils().get_environment_variable("SECRET_KEY")
-ALGORITHM = CommonUtils().get_environment_variable("ALGORITHM")
+SECRET_KEY = settings.get_str("SECRET_KEY")
+ALGORITHM = settings.get_str("ALGORITHM")
+BCRYPT_ROUNDS = settings.get_int("BCRYPT_ROUNDS", 12)
+BCRYPT_POOL_SIZE = settings.get_int("BCRYPT_POOL_SIZE", os.cpu_count() or 1)
+BCRYPT_QUEUE_DEPTH = settings.get_int("BCRYPT_QUEUE_DEPTH", 64)
+BCRYPT_TIMEOUT = settings.get_float("BCRYPT_TIMEOUT", 10)
 
 # Database Constants.
-MONGODB_URL_KEY = CommonUtils().get_environment_variable("MONGODB_URL_KEY")
-DATABASE_NAME = CommonUtils().get_environment_variable("DATABASE_NAME")
-USER_COLLECTION_NAME = CommonUtils().get_environment_variable("USER_COLLECTION_NAME")
-EMBEDDING_COLLECTION_NAME = CommonUtils().get_environment_variable(
-    "EMBEDDING_COLLECTION_NAME"
+MONGODB_URL_KEY = settings.get_str("MONGODB_URL_KEY")
+DATABASE_NAME = settings.get_str("DATABASE_NAME")
+USER_COLLECTION_NAME = settings.get_str("USER_COLLECTION_NAME")
+EMBEDDING_COLLECTION_NAME = settings.get_str("EMBEDDING_COLLECTION_NAME")
+MONGODB_MAX_POOL_SIZE = settings.get_int("MONGODB_MAX_POOL_SIZE", 100)
+MONGODB_MIN_POOL_SIZE = settings.get_int("MONGODB_MIN_POOL_SIZE", 0)
+MONGODB_SERVER_SELECTION_TIMEOUT_MS = settings.get_int(
+    "MONGODB_SERVER_SELECTION_TIMEOUT_MS", 5000
 )
+MONGODB_CONNECT_TIMEOUT_MS = settings.get_int("MONGODB_CONNECT_TIMEOUT_MS", 5000)
+MONGODB_SOCKET_TIMEOUT_MS = settings.get_int("MONGODB_SOCKET_TIMEOUT_MS", 10000)
+MONGODB_READ_PREFERENCE = settings.get_str("MONGODB_READ_PREFERENCE", "primary")
 
 # Embedding Constants.
 EMBEDDING_SIZE = 128
 EMBEDDING_TYPE = 1
 SIMILARITY_THRESHOLD = 0.75
-DETECTOR_BACKEND = "mtcnn"
+# Detector cascade, cheapest first; the last backend is the full face detector.
+DETECTOR_CASCADE = settings.get_list("DETECTOR_CASCADE", "opencv,mtcnn")
+DETECTOR_BACKEND = DETECTOR_CASCADE[-1]
+DETECTOR_LATENCY_BUDGET_MS = settings.get_float("DETECTOR_LATENCY_BUDGET_MS", 250)
+DETECTOR_SKIP_CONFIDENCE = settings.get_float("DETECTOR_SKIP_CONFIDENCE", 6.0)
+# Opt-in: return the unaligned proposal crop when a proposal is confident, the
+# latency budget is spent or refinement fails. Facenet embeddings of unaligned
+# crops score lower against aligned enrollments and raise the false rejection
+# rate, so by default every face is refined and aligned.
+DETECTOR_UNALIGNED_FALLBACK = settings.get_bool("DETECTOR_UNALIGNED_FALLBACK", False)
+DETECTOR_CROP_MARGIN = 0.25
 ENFORCE_DETECTION = False
+# Burst frames re-use the previous face region while its crop still correlates above
+# the threshold with the last fully detected frame.
+BURST_TRACKING_ENABLED = settings.get_bool("BURST_TRACKING_ENABLED", True)
+BURST_MATCH_THRESHOLD = settings.get_float("BURST_MATCH_THRESHOLD", 0.9)
+BURST_SIGNATURE_SIZE = 32
 EMBEDDING_MODEL_NAME = "Facenet"
+# Face preprocessing behind the stored embeddings. Version 1 (documents without
+# embed_version) re-detected every face crop with DeepFace.represent's opencv
+# detector; version 2 embeds the aligned detector crop as is. Embeddings of the
+# two versions are not comparable, so version 1 users have to re-enroll.
+EMBEDDING_VERSION = 2
+LEGACY_EMBEDDING_VERSION = 1
+# Stored representation: "float32", "float16" or per-vector scaled "int8". float16
+# halves the stored size only; the identification index keeps those rows as float32,
+# since widening float16 made its scan about 10x slower. int8 rows stay quantized
+# in the index.
+EMBEDDING_DTYPE = settings.get_str("EMBEDDING_DTYPE", "float32")
+WARM_UP_IMAGE_SHAPE = (224, 224, 3)
+# Load and warm the models in the background at startup instead of on first use.
+WARM_UP_ON_STARTUP = settings.get_bool("WARM_UP_ON_STARTUP", True)
+IDENTIFICATION_TOP_K = 5
+# Add embeddings enrolled by other processes to the identification index this often;
+# 0 disables.
+EMBEDDING_INDEX_REFRESH_SECONDS = settings.get_float(
+    "EMBEDDING_INDEX_REFRESH_SECONDS", 300
+)
+# Refreshes only read new documents; rebuild the whole index this often to also drop
+# embeddings deleted or replaced by other processes. 0 disables.
+EMBEDDING_INDEX_FULL_RELOAD_SECONDS = settings.get_float(
+    "EMBEDDING_INDEX_FULL_RELOAD_SECONDS", 3600
+)
+
+# Multi-Template Enrollment Constants.
+TEMPLATE_MAX_COUNT = settings.get_int("TEMPLATE_MAX_COUNT", 5)
+# "centroid" scores the mean template against the mean frame, the statistic
+# SIMILARITY_THRESHOLD was tuned on; "max", "mean" and "topk" reduce every
+# template x frame similarity and need their own threshold.
+TEMPLATE_AGGREGATION = settings.get_str("TEMPLATE_AGGREGATION", "centroid")
+TEMPLATE_TOP_K = settings.get_int("TEMPLATE_TOP_K", 3)
+TEMPLATE_REFRESH_ENABLED = settings.get_bool("TEMPLATE_REFRESH_ENABLED", False)
+TEMPLATE_REFRESH_THRESHOLD = settings.get_float("TEMPLATE_REFRESH_THRESHOLD", 0.9)
+
+# Progressive Verification Constants.
+PROGRESSIVE_VERIFICATION_ENABLED = settings.get_bool(
+    "PROGRESSIVE_VERIFICATION_ENABLED", True
+)
+PROGRESSIVE_MIN_FRAMES = settings.get_int("PROGRESSIVE_MIN_FRAMES", 2)
+# Stop once the running score is this far above or below SIMILARITY_THRESHOLD.
+PROGRESSIVE_ACCEPT_MARGIN = settings.get_float("PROGRESSIVE_ACCEPT_MARGIN", 0.1)
+PROGRESSIVE_REJECT_MARGIN = settings.get_float("PROGRESSIVE_REJECT_MARGIN", 0.25)
+
+# Streaming Login Constants.
+# A stream is decided after this many frames or seconds even if it is not confident.
+STREAM_MAX_FRAMES = settings.get_int("STREAM_MAX_FRAMES", 10)
+STREAM_TIMEOUT = settings.get_float("STREAM_TIMEOUT", 15)
+
+# Image Preprocessing Constants.
+IMAGE_MAX_SIDE = settings.get_int("IMAGE_MAX_SIDE", 640)
+IMAGE_MAX_BYTES = settings.get_int("IMAGE_MAX_BYTES", 10 * 1024 * 1024)
+IMAGE_MAX_PIXELS = settings.get_int("IMAGE_MAX_PIXELS", 50_000_000)
+
+# Embedding Batch Scheduler Constants.
+EMBEDDING_BATCHING_ENABLED = settings.get_bool("EMBEDDING_BATCHING_ENABLED", True)
+EMBEDDING_BATCH_MAX_SIZE = settings.get_int("EMBEDDING_BATCH_MAX_SIZE", 32)
+EMBEDDING_BATCH_WAIT_MS = settings.get_float("EMBEDDING_BATCH_WAIT_MS", 5)
+
+# Inference Executor Constants.
+# Requests reach the batch scheduler from the executor threads, so with batching
+# the pool is as large as a batch; detection is bounded separately per core.
+INFERENCE_POOL_SIZE = settings.get_int(
+    "INFERENCE_POOL_SIZE", EMBEDDING_BATCH_MAX_SIZE if EMBEDDING_BATCHING_ENABLED else 2
+)
+INFERENCE_DETECT_CONCURRENCY = settings.get_int(
+    "INFERENCE_DETECT_CONCURRENCY", os.cpu_count() or 1
+)
+INFERENCE_QUEUE_DEPTH = settings.get_int("INFERENCE_QUEUE_DEPTH", 16)
+INFERENCE_TIMEOUT = settings.get_float("INFERENCE_TIMEOUT", 30)
+
+# Inference Backend Constants.
+# "tensorflow" runs the deepface Keras models, "onnx" the exported ONNX models.
+INFERENCE_BACKEND = settings.get_str("INFERENCE_BACKEND", "tensorflow")
+ONNX_MODEL_DIR = settings.get_str(
+    "ONNX_MODEL_DIR", os.path.join(os.path.expanduser("~"), ".deepface", "onnx")
+)
+# Split the cores between the concurrent MTCNN detections so they do not oversubscribe.
+ONNX_INTRA_OP_THREADS = settings.get_int(
+    "ONNX_INTRA_OP_THREADS",
+    max(1, (os.cpu_count() or 1) // INFERENCE_DETECT_CONCURRENCY),
+)
+ONNX_INTER_OP_THREADS = settings.get_int("ONNX_INTER_OP_THREADS", 1)
+# The embedding model runs one batched session per request, so it keeps every core.
+ONNX_EMBED_INTRA_OP_THREADS = settings.get_int(
+    "ONNX_EMBED_INTRA_OP_THREADS", os.cpu_count() or 1
+)
+
+# Embedding Cache Constants.
+EMBEDDING_CACHE_SIZE = settings.get_int("EMBEDDING_CACHE_SIZE", 10000)
+EMBEDDING_CACHE_TTL = settings.get_float("EMBEDDING_CACHE_TTL", 300)
+
+# Image Embedding Cache Constants.
+IMAGE_CACHE_SIZE = settings.get_int("IMAGE_CACHE_SIZE", 4096)
+# Directory of the optional on-disk tier, disabled when empty.
+IMAGE_CACHE_DIR = settings.get_str("IMAGE_CACHE_DIR", "")
+IMAGE_CACHE_DISK_SIZE = settings.get_int("IMAGE_CACHE_DISK_SIZE", 100000)
@@ -0,0 +1,45 @@
+from faceapp.entity.user import User
+from faceapp.config.async_database import AsyncMongoDBClient
+from faceapp.constant import USER_COLLECTION_NAME
+from faceapp.data_access.async_user_embedding_data import AsyncUserEmbeddingData
+from faceapp.metrics import MONGO_LATENCY
+
+
+class AsyncUserData:
+    def __init__(self) -> None:
+        self.client = AsyncMongoDBClient()
+        self.collection_name = USER_COLLECTION_NAME
+        self.collection = self.client.database[self.collection_name]
+
+    async def create_indexes(self) -> None:
+        # Unique indexes back the registration lookup and reject duplicate users.
+        for field in ("username", "email_id", "UUID"):
+            await self.collection.create_index(field, unique=True)
+
+    async def save_user(self, user: User) -> None:
+        with MONGO_LATENCY.time():
+            await self.collection.insert_one(user)
+
+    async def get_user(self, query: dict, projection: dict = None):
+        with MONGO_LATENCY.time():
+            return await self.collection.find_one(query, projection)
+
+    async def update_user(self, query: dict, values: dict) -> None:
+        with MONGO_LATENCY.time():
+            await self.collection.update_one(query, {"$set": values})
+
+    async def get_all_users(self) -> list:
+        cursor = self.collection.find({}, {"_id": 0, "password": 0})
+        return await cursor.to_list(length=None)
+
+    async def delete_user(self, user_id: str) -> None:
+        # The user's embeddings go with the account, so it can no longer log in
+        # or be identified.
+        with MONGO_LATENCY.time():
+            await self.collection.delete_one({"UUID": user_id})
+        await AsyncUserEmbeddingData().delete_user_embedding(user_id)
+
+    async def delete_all_users(self) -> None:
+        with MONGO_LATENCY.time():
+            await self.collection.delete_many({})
+        await AsyncUserEmbeddingData().delete_all_user_embeddings()
@@ -0,0 +1,56 @@
+from faceapp.config.async_database import AsyncMongoDBClient
+from faceapp.constant import EMBEDDING_COLLECTION_NAME
+from faceapp.data_access.embedding_cache import embedding_cache
+from faceapp.data_access.user_embedding_data import UserEmbeddingData
+from faceapp.entity.user_embedding import Embedding
+from faceapp.metrics import MONGO_LATENCY
+
+
+class AsyncUserEmbeddingData:
+    def __init__(self) -> None:
+        self.client = AsyncMongoDBClient()
+        self.collection_name = EMBEDDING_COLLECTION_NAME
+        self.collection = self.client.database[self.collection_name]
+
+    async def create_indexes(self) -> None:
+        # One embedding document per user, so a repeated save cannot add a duplicate.
+        await self.collection.create_index("UUID", unique=True)
+
+    async def save_user_embedding(
+        self, uuid_: str, embedding_list, templates=None
+    ) -> None:
+        document = Embedding(
+            UUID=uuid_, user_embed=embedding_list, templates=templates
+        ).to_document()
+        with MONGO_LATENCY.time():
+            await self.collection.replace_one({"UUID": uuid_}, document, upsert=True)
+        UserEmbeddingData.cache_user_embedding(document)
+
+    async def delete_user_embedding(self, uuid_: str) -> None:
+        with MONGO_LATENCY.time():
+            await self.collection.delete_many({"UUID": uuid_})
+        UserEmbeddingData.evict_user_embedding(uuid_)
+
+    async def delete_all_user_embeddings(self) -> None:
+        with MONGO_LATENCY.time():
+            await self.collection.delete_many({})
+        UserEmbeddingData.evict_user_embedding()
+
+    async def get_user_embedding(self, uuid_: str) -> dict:
+        user = embedding_cache.get(uuid_)
+        if user is not None:
+            return user
+        with MONGO_LATENCY.time():
+            user: dict = await self.collection.find_one({"UUID": uuid_})
+        if user is None:
+            return None
+        user = UserEmbeddingData.decode_user_embedding(user)
+        embedding_cache.put(uuid_, user)
+        return user
+
+    async def get_all_embeddings(self) -> list:
+        cursor = self.collection.find(
+            {},
+            {"_id": 0, "UUID": 1, "user_embed": 1, "embed_dtype": 1, "embed_scale": 1},
+        )
+        return await cursor.to_list(length=None)
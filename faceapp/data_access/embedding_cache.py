@@ -0,0 +1,62 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from faceapp.constant import EMBEDDING_CACHE_SIZE, EMBEDDING_CACHE_TTL
+from faceapp.metrics import EMBEDDING_CACHE_HITS, EMBEDDING_CACHE_MISSES
+
+
+class EmbeddingCache:
+    """
+    Bounded LRU cache of decoded user embeddings keyed by UUID.
+    Entries expire ttl seconds after they were written.
+    """
+
+    def __init__(
+        self, max_size: int = EMBEDDING_CACHE_SIZE, ttl: float = EMBEDDING_CACHE_TTL
+    ) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, uuid_: str) -> Optional[dict]:
+        with self.lock:
+            entry = self.entries.get(uuid_)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self.entries[uuid_]
+                self.misses += 1
+                EMBEDDING_CACHE_MISSES.inc()
+                return None
+            self.entries.move_to_end(uuid_)
+            self.hits += 1
+            EMBEDDING_CACHE_HITS.inc()
+            return entry[1]
+
+    def put(self, uuid_: str, value: dict) -> None:
+        if self.max_size <= 0:
+            return
+        with self.lock:
+            self.entries[uuid_] = (time.monotonic() + self.ttl, value)
+            self.entries.move_to_end(uuid_)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, uuid_: str) -> None:
+        with self.lock:
+            self.entries.pop(uuid_, None)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {"size": len(self.entries), "hits": self.hits, "misses": self.misses}
+
+
+embedding_cache = EmbeddingCache()
@@ -0,0 +1,189 @@
+import threading
+import time
+import numpy as np
+from typing import Iterable, List, Tuple
+
+from faceapp.constant import EMBEDDING_DTYPE, EMBEDDING_SIZE
+from faceapp.data_access.embedding_quantization import (
+    STORAGE_DTYPES,
+    EmbeddingQuantizer,
+)
+
+
+class EmbeddingIndex:
+    """
+    In-memory index of every enrolled embedding for 1:N identification.
+    Rows are L2-normalised float32, so one matrix-vector product gives the
+    cosine similarity of a probe against every enrolled user. int8 rows are
+    kept quantized, with one scale per row. float16 only pays off at rest, so
+    those rows are kept as float32.
+    """
+
+    def __init__(
+        self,
+        dim: int = EMBEDDING_SIZE,
+        capacity: int = 1024,
+        dtype: str = EMBEDDING_DTYPE,
+    ) -> None:
+        self.dim = dim
+        self.dtype = "float32" if dtype == "float16" else dtype
+        self.matrix = np.empty((capacity, dim), dtype=STORAGE_DTYPES[self.dtype])
+        self.scales = np.ones(capacity, dtype=np.float32)
+        self.uuids: List[str] = []
+        self.rows: dict = {}
+        self.size = 0
+        self.loaded = False
+        self.loaded_at = None
+        # Newest document id loaded, so a refresh only reads later insertions.
+        self.last_id = None
+        # Upserts and removals made while a load runs, replayed over the loaded rows.
+        self.changes = None
+        self.lock = threading.RLock()
+        self.load_lock = threading.Lock()
+
+    @staticmethod
+    def normalize(embedding) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32).reshape(-1)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def _reserve(self, capacity: int) -> None:
+        # Grow the matrix geometrically so appends stay amortised O(1).
+        if capacity <= len(self.matrix):
+            return
+        capacity = max(capacity, 2 * len(self.matrix))
+        matrix = np.empty((capacity, self.dim), dtype=self.matrix.dtype)
+        matrix[: self.size] = self.matrix[: self.size]
+        scales = np.ones(capacity, dtype=np.float32)
+        scales[: self.size] = self.scales[: self.size]
+        self.matrix, self.scales = matrix, scales
+
+    def _write(self, uuid_: str, codes: np.ndarray, scales: np.ndarray) -> None:
+        # Store one quantized row; the caller holds the lock.
+        row = self.rows.get(uuid_)
+        if row is None:
+            self._reserve(self.size + 1)
+            row = self.size
+            self.rows[uuid_] = row
+            self.uuids.append(uuid_)
+            self.size += 1
+        self.matrix[row] = codes[0]
+        self.scales[row] = 1.0 if scales is None else scales[0]
+
+    def upsert(self, uuid_: str, embedding) -> None:
+        # Insert or replace the embedding of one user.
+        codes, scales = EmbeddingQuantizer.quantize(
+            self.normalize(embedding), self.dtype
+        )
+        with self.lock:
+            if self.changes is not None:
+                self.changes[uuid_] = embedding
+            self._write(uuid_, codes, scales)
+
+    def remove(self, uuid_: str) -> None:
+        # Move the last row into the freed slot to keep the matrix contiguous.
+        with self.lock:
+            if self.changes is not None:
+                self.changes[uuid_] = None
+            row = self.rows.pop(uuid_, None)
+            if row is None:
+                return
+            last = self.size - 1
+            if row != last:
+                self.matrix[row] = self.matrix[last]
+                self.scales[row] = self.scales[last]
+                self.uuids[row] = self.uuids[last]
+                self.rows[self.uuids[row]] = row
+            self.uuids.pop()
+            self.size -= 1
+
+    @property
+    def nbytes(self) -> int:
+        # Bytes read by one full scan of the enrolled rows.
+        scale_bytes = self.scales.itemsize if self.dtype == "int8" else 0
+        return self.size * (self.dim * self.matrix.itemsize + scale_bytes)
+
+    def _quantize_documents(self, documents: Iterable[dict]) -> Tuple[dict, object]:
+        # Quantize the embedding documents by UUID, and find the newest document id.
+        rows, last_id = {}, None
+        for document in documents:
+            if document.get("user_embed") is not None:
+                rows[document["UUID"]] = EmbeddingQuantizer.quantize(
+                    self.normalize(document["user_embed"]), self.dtype
+                )
+            document_id = document.get("_id")
+            if document_id is not None and (last_id is None or document_id > last_id):
+                last_id = document_id
+        return rows, last_id
+
+    def load(self, documents: Iterable[dict]) -> None:
+        # Rebuild the index from the embedding documents. The new rows are built
+        # outside the lock and swapped in, so searches keep running during a load;
+        # entries upserted or removed meanwhile are replayed on top.
+        with self.load_lock:
+            with self.lock:
+                self.changes = {}
+            try:
+                rows, last_id = self._quantize_documents(documents)
+                uuids = list(rows)
+                matrix = np.empty(
+                    (max(len(uuids), 1024), self.dim), dtype=STORAGE_DTYPES[self.dtype]
+                )
+                scales = np.ones(len(matrix), dtype=np.float32)
+                for row, (codes, row_scales) in enumerate(rows.values()):
+                    matrix[row] = codes[0]
+                    scales[row] = 1.0 if row_scales is None else row_scales[0]
+            except Exception:
+                with self.lock:
+                    self.changes = None
+                raise
+
+            with self.lock:
+                changes, self.changes = self.changes, None
+                self.matrix, self.scales, self.uuids = matrix, scales, uuids
+                self.rows = {uuid_: row for row, uuid_ in enumerate(uuids)}
+                self.size = len(uuids)
+                self.last_id = last_id
+                for uuid_, embedding in changes.items():
+                    if embedding is None:
+                        self.remove(uuid_)
+                    else:
+                        self.upsert(uuid_, embedding)
+                self.loaded = True
+                self.loaded_at = time.monotonic()
+
+    def extend(self, documents: Iterable[dict]) -> None:
+        # Upsert the documents inserted since the last load. They are quantized
+        # outside the lock, which is then held only to copy the new rows in.
+        with self.load_lock:
+            rows, last_id = self._quantize_documents(documents)
+            with self.lock:
+                self._reserve(self.size + len(rows))
+                for uuid_, (codes, scales) in rows.items():
+                    self._write(uuid_, codes, scales)
+                if last_id is not None and (
+                    self.last_id is None or last_id > self.last_id
+                ):
+                    self.last_id = last_id
+
+    def search(self, embedding, top_k: int) -> List[Tuple[str, float]]:
+        # Return the top_k (UUID, cosine similarity) pairs, best first.
+        probe = self.normalize(embedding)
+        with self.lock:
+            if self.size == 0:
+                return []
+            scores = EmbeddingQuantizer.score(
+                self.matrix[: self.size],
+                self.scales[: self.size] if self.dtype == "int8" else None,
+                probe,
+            )
+            top_k = min(top_k, self.size)
+            if top_k < self.size:
+                top = np.argpartition(-scores, top_k - 1)[:top_k]
+            else:
+                top = np.arange(self.size)
+            top = top[np.argsort(-scores[top])]
+            return [(self.uuids[row], float(scores[row])) for row in top]
+
+
+embedding_index = EmbeddingIndex()
@@ -0,0 +1,190 @@
+import hashlib
+import os
+import threading
+import numpy as np
+from collections import OrderedDict
+from typing import Optional
+
+from faceapp.constant import (
+    BURST_MATCH_THRESHOLD,
+    BURST_TRACKING_ENABLED,
+    DETECTOR_CASCADE,
+    DETECTOR_LATENCY_BUDGET_MS,
+    DETECTOR_SKIP_CONFIDENCE,
+    DETECTOR_UNALIGNED_FALLBACK,
+    EMBEDDING_MODEL_NAME,
+    EMBEDDING_VERSION,
+    IMAGE_CACHE_DIR,
+    IMAGE_CACHE_DISK_SIZE,
+    IMAGE_CACHE_SIZE,
+    IMAGE_MAX_SIDE,
+    INFERENCE_BACKEND,
+)
+from faceapp.logger import logging
+from faceapp.metrics import (
+    IMAGE_CACHE_DISK_HITS,
+    IMAGE_CACHE_HITS,
+    IMAGE_CACHE_MISSES,
+)
+
+# Cached result of an image in which no face was detected.
+NO_FACE = "no_face"
+
+
+class ImageEmbeddingCache:
+    """
+    Bounded LRU cache of per-image results keyed by a hash of the uploaded
+    bytes and the settings of the detector and model that produced them. An
+    entry is (embedding, region) or NO_FACE. When cache_dir is set, entries
+    are also written to disk and reloaded from there on a memory miss.
+    """
+
+    def __init__(
+        self,
+        max_size: int = IMAGE_CACHE_SIZE,
+        cache_dir: str = IMAGE_CACHE_DIR,
+        disk_max_size: int = IMAGE_CACHE_DISK_SIZE,
+    ) -> None:
+        self.max_size = max_size
+        self.cache_dir = cache_dir
+        self.disk_max_size = disk_max_size
+        self.disk_size = None
+        namespace = (
+            f"{','.join(DETECTOR_CASCADE)}:{DETECTOR_LATENCY_BUDGET_MS}:"
+            f"{DETECTOR_SKIP_CONFIDENCE}:{DETECTOR_UNALIGNED_FALLBACK}:"
+            f"{BURST_TRACKING_ENABLED}:{BURST_MATCH_THRESHOLD}:"
+            f"{INFERENCE_BACKEND}:{EMBEDDING_MODEL_NAME}:"
+            f"{EMBEDDING_VERSION}:{IMAGE_MAX_SIDE}"
+        )
+        self.namespace = hashlib.blake2b(namespace.encode(), digest_size=4).hexdigest()
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.prune_lock = threading.Lock()
+
+    def key(self, contents: bytes) -> str:
+        digest = hashlib.blake2b(contents, digest_size=16).hexdigest()
+        return f"{digest}-{self.namespace}"
+
+    def get(self, key: str):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                IMAGE_CACHE_HITS.inc()
+                return entry
+        entry = self.read(key)
+        if entry is None:
+            IMAGE_CACHE_MISSES.inc()
+            return None
+        IMAGE_CACHE_DISK_HITS.inc()
+        self.remember(key, entry)
+        return entry
+
+    def put(self, key: str, entry) -> None:
+        if entry is not NO_FACE:
+            embedding, region = entry
+            embedding = np.array(embedding, dtype=np.float32)
+            embedding.setflags(write=False)
+            entry = (embedding, region)
+        self.remember(key, entry)
+        self.write(key, entry)
+
+    def remember(self, key: str, entry) -> None:
+        if self.max_size <= 0:
+            return
+        with self.lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.npz")
+
+    def read(self, key: str) -> Optional[tuple]:
+        if not self.cache_dir:
+            return None
+        try:
+            with np.load(self.path(key)) as stored:
+                if stored["embedding"].size == 0:
+                    return NO_FACE
+                region = stored["region"].tolist() if stored["region"].size else None
+                embedding = stored["embedding"]
+                embedding.setflags(write=False)
+                return embedding, region
+        except (OSError, KeyError, ValueError):
+            return None
+
+    def write(self, key: str, entry) -> None:
+        # The disk tier is best effort; a failed write only costs a future miss.
+        if not self.cache_dir:
+            return
+        if entry is NO_FACE:
+            embedding, region = np.empty(0, np.float32), None
+        else:
+            embedding, region = entry
+        try:
+            path = self.path(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp_path, "wb") as cache_file:
+                np.savez(
+                    cache_file,
+                    embedding=embedding,
+                    region=np.asarray(region if region is not None else [], np.int64),
+                )
+            os.replace(temp_path, path)
+            self.prune()
+        except OSError as e:
+            logging.error(f"Image Cache Write Failed: {e}")
+
+    def prune(self) -> None:
+        # Count the files once, then drop the oldest tenth whenever the tier is full.
+        # Only the counter is updated under the lock; one writer at a time scans
+        # and deletes, and the others skip pruning meanwhile.
+        with self.lock:
+            if self.disk_size is not None:
+                self.disk_size += 1
+                if self.disk_size <= self.disk_max_size:
+                    return
+        if not self.prune_lock.acquire(blocking=False):
+            return
+        try:
+            files = self.disk_files()
+            if len(files) > self.disk_max_size:
+                files.sort(key=self.modified_time)
+                excess = max(1, len(files) - int(self.disk_max_size * 0.9))
+                for entry in files[:excess]:
+                    try:
+                        os.remove(entry.path)
+                    except FileNotFoundError:
+                        pass
+                files = files[excess:]
+            with self.lock:
+                self.disk_size = len(files)
+        finally:
+            self.prune_lock.release()
+
+    @staticmethod
+    def modified_time(entry: os.DirEntry) -> float:
+        # Files removed by another process since the scan sort first.
+        try:
+            return entry.stat().st_mtime
+        except FileNotFoundError:
+            return 0.0
+
+    def disk_files(self) -> list:
+        return [
+            entry
+            for folder in os.scandir(self.cache_dir)
+            if folder.is_dir()
+            for entry in os.scandir(folder.path)
+            if entry.name.endswith(".npz")
+        ]
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+
+
+image_embedding_cache = ImageEmbeddingCache()
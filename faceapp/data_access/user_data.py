@@ -1,6 +1,8 @@
 from faceapp.entity.user import User
 from faceapp.config.database import MongoDBClient
 from faceapp.constant import USER_COLLECTION_NAME
+from faceapp.data_access.user_embedding_data import UserEmbeddingData
+from faceapp.metrics import MONGO_LATENCY
 
 
 class UserData:
@@ -9,17 +11,34 @@ class UserData:
         self.collection_name = USER_COLLECTION_NAME
         self.collection = self.client.database[self.collection_name]
 
+    def create_indexes(self) -> None:
+        # Unique indexes back the registration lookup and reject duplicate users.
+        for field in ("username", "email_id", "UUID"):
+            self.collection.create_index(field, unique=True)
+
     def save_user(self, user: User) -> None:
-        self.collection.insert_one(user)
+        with MONGO_LATENCY.time():
+            self.collection.insert_one(user)
+
+    def get_user(self, query: dict, projection: dict = None):
+        with MONGO_LATENCY.time():
+            return self.collection.find_one(query, projection)
 
-    def get_user(self, query: dict):
-        return self.collection.find_one(query)
+    def update_user(self, query: dict, values: dict) -> None:
+        with MONGO_LATENCY.time():
+            self.collection.update_one(query, {"$set": values})
 
-    def get_all_users(self):
-        pass
+    def get_all_users(self) -> list:
+        return list(self.collection.find({}, {"_id": 0, "password": 0}))
 
     def delete_user(self, user_id: str) -> None:
-        pass
+        # The user's embeddings go with the account, so it can no longer log in
+        # or be identified.
+        with MONGO_LATENCY.time():
+            self.collection.delete_one({"UUID": user_id})
+        UserEmbeddingData().delete_user_embedding(user_id)
 
     def delete_all_users(self) -> None:
-        pass
+        with MONGO_LATENCY.time():
+            self.collection.delete_many({})
+        UserEmbeddingData().delete_all_user_embeddings()
@@ -1,5 +1,16 @@
+import time
+from pymongo import ReturnDocument
+
 from faceapp.config.database import MongoDBClient
-from faceapp.constant import EMBEDDING_COLLECTION_NAME
+from faceapp.constant import (
+    EMBEDDING_COLLECTION_NAME,
+    EMBEDDING_DTYPE,
+    EMBEDDING_INDEX_FULL_RELOAD_SECONDS,
+)
+from faceapp.data_access.embedding_cache import embedding_cache
+from faceapp.data_access.embedding_index import embedding_index
+from faceapp.entity.user_embedding import Embedding
+from faceapp.metrics import MONGO_LATENCY
 
 
 class UserEmbeddingData:
@@ -8,9 +19,110 @@ class UserEmbeddingData:
         self.collection_name = EMBEDDING_COLLECTION_NAME
         self.collection = self.client.database[self.collection_name]
 
-    def save_user_embedding(self, uuid_: str, embedding_list) -> None:
-        self.collection.insert_one({"UUID": uuid_, "user_embed": embedding_list})
+    @staticmethod
+    def decode_user_embedding(user: dict) -> dict:
+        # Keep only the fields used for matching, with the embedding as a read-only array.
+        embedding = Embedding.from_document(user)
+        user_embed, templates = embedding.user_embed, embedding.templates
+        for array in (user_embed, templates):
+            if array is not None:
+                array.setflags(write=False)
+        return {
+            "UUID": user.get("UUID"),
+            "user_embed": user_embed,
+            "templates": templates,
+        }
+
+    @staticmethod
+    def cache_user_embedding(document: dict) -> None:
+        # Write a newly stored embedding through to the cache and the identification index.
+        user = UserEmbeddingData.decode_user_embedding(document)
+        embedding_cache.put(user["UUID"], user)
+        embedding_index.upsert(user["UUID"], user["user_embed"])
+
+    @staticmethod
+    def evict_user_embedding(uuid_: str = None) -> None:
+        # Drop deleted embeddings from the cache and the identification index,
+        # or every embedding when no UUID is given.
+        if uuid_ is None:
+            embedding_cache.clear()
+            embedding_index.load([])
+            return
+        embedding_cache.invalidate(uuid_)
+        embedding_index.remove(uuid_)
+
+    def create_indexes(self) -> None:
+        # One embedding document per user, so a repeated save cannot add a duplicate.
+        self.collection.create_index("UUID", unique=True)
+
+    def save_user_embedding(self, uuid_: str, embedding_list, templates=None) -> None:
+        document = Embedding(
+            UUID=uuid_, user_embed=embedding_list, templates=templates
+        ).to_document()
+        with MONGO_LATENCY.time():
+            self.collection.replace_one({"UUID": uuid_}, document, upsert=True)
+        UserEmbeddingData.cache_user_embedding(document)
+
+    def update_templates(self, uuid_: str, templates) -> None:
+        # Replace the stored templates and refresh the cached copy.
+        values = Embedding.template_fields(templates, EMBEDDING_DTYPE)
+        with MONGO_LATENCY.time():
+            document = self.collection.find_one_and_update(
+                {"UUID": uuid_}, {"$set": values}, return_document=ReturnDocument.AFTER
+            )
+        if document is not None:
+            embedding_cache.put(
+                uuid_, UserEmbeddingData.decode_user_embedding(document)
+            )
+
+    def delete_user_embedding(self, uuid_: str) -> None:
+        with MONGO_LATENCY.time():
+            self.collection.delete_many({"UUID": uuid_})
+        UserEmbeddingData.evict_user_embedding(uuid_)
+
+    def delete_all_user_embeddings(self) -> None:
+        with MONGO_LATENCY.time():
+            self.collection.delete_many({})
+        UserEmbeddingData.evict_user_embedding()
 
     def get_user_embedding(self, uuid_: str) -> dict:
-        user: dict = self.collection.find_one({"UUID": uuid_})
-        return user if user != None else None
+        user = embedding_cache.get(uuid_)
+        if user is not None:
+            return user
+        with MONGO_LATENCY.time():
+            user: dict = self.collection.find_one({"UUID": uuid_})
+        if user is None:
+            return None
+        user = UserEmbeddingData.decode_user_embedding(user)
+        embedding_cache.put(uuid_, user)
+        return user
+
+    def get_all_embeddings(self, after=None):
+        # Every embedding document, or only those inserted after the given _id.
+        return self.collection.find(
+            {} if after is None else {"_id": {"$gt": after}},
+            {"UUID": 1, "user_embed": 1, "embed_dtype": 1, "embed_scale": 1},
+        )
+
+    def load_embedding_index(self, refresh: bool = False) -> None:
+        # Fill the in-memory identification index from the embedding collection.
+        # A refresh adds the users enrolled by other processes since the last
+        # read, and periodically rebuilds the index to drop deleted users.
+        full_reload = not embedding_index.loaded or (
+            refresh
+            and EMBEDDING_INDEX_FULL_RELOAD_SECONDS > 0
+            and time.monotonic() - embedding_index.loaded_at
+            >= EMBEDDING_INDEX_FULL_RELOAD_SECONDS
+        )
+        if not (full_reload or refresh):
+            return
+        documents = (
+            {**UserEmbeddingData.decode_user_embedding(user), "_id": user["_id"]}
+            for user in self.get_all_embeddings(
+                None if full_reload else embedding_index.last_id
+            )
+        )
+        if full_reload:
+            embedding_index.load(documents)
+        else:
+            embedding_index.extend(documents)
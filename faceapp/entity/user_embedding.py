@@ -1,7 +1,112 @@
+import numpy as np
+from bson.binary import Binary
+from typing import Tuple
+
+from faceapp.constant import (
+    EMBEDDING_DTYPE,
+    EMBEDDING_MODEL_NAME,
+    EMBEDDING_SIZE,
+    EMBEDDING_VERSION,
+    LEGACY_EMBEDDING_VERSION,
+)
+from faceapp.data_access.embedding_quantization import (
+    STORAGE_DTYPES,
+    EmbeddingQuantizer,
+)
+
+
 class Embedding:
-    def __init__(self, UUID: str = None, user_embed=None) -> None:
+    def __init__(
+        self,
+        UUID: str = None,
+        user_embed=None,
+        embed_model: str = EMBEDDING_MODEL_NAME,
+        embed_version: int = EMBEDDING_VERSION,
+        templates=None,
+        embed_dtype: str = EMBEDDING_DTYPE,
+    ) -> None:
         self.UUID = UUID
         self.user_embed = user_embed
+        self.templates = templates
+        self.embed_model = embed_model
+        self.embed_version = embed_version
+        self.embed_dtype = embed_dtype
+
+    @staticmethod
+    def encode(user_embed, dtype: str = "float32") -> Tuple[Binary, Binary]:
+        # Pack the embedding rows as little-endian codes of dtype, with the
+        # per-row float32 scales for int8 (None otherwise).
+        codes, scales = EmbeddingQuantizer.quantize(user_embed, dtype)
+        if scales is None:
+            return Binary(codes.tobytes()), None
+        return Binary(codes.tobytes()), Binary(scales.astype("<f4").tobytes())
+
+    @staticmethod
+    def decode(user_embed, dtype: str = "float32", scales=None) -> np.ndarray:
+        # Packed float32 embeddings are read zero-copy, quantized ones are widened
+        # to float32 and legacy BSON arrays are converted once.
+        if user_embed is None:
+            return None
+        if not isinstance(user_embed, bytes):
+            return np.asarray(user_embed, dtype=np.float32)
+        codes = np.frombuffer(user_embed, dtype=STORAGE_DTYPES[dtype])
+        if dtype == "float32":
+            return codes
+        if scales is not None:
+            scales = np.frombuffer(scales, dtype="<f4")
+        return EmbeddingQuantizer.dequantize(
+            codes.reshape(-1, EMBEDDING_SIZE), scales
+        ).reshape(-1)
+
+    @staticmethod
+    def decode_templates(templates, dtype: str = "float32", scales=None) -> np.ndarray:
+        # Templates are packed row after row into one (T, EMBEDDING_SIZE) buffer.
+        if templates is None:
+            return None
+        return Embedding.decode(templates, dtype, scales).reshape(-1, EMBEDDING_SIZE)
+
+    @classmethod
+    def from_document(cls, document: dict) -> "Embedding":
+        embed_dtype = document.get("embed_dtype", "float32")
+        return cls(
+            UUID=document.get("UUID"),
+            user_embed=cls.decode(
+                document.get("user_embed"), embed_dtype, document.get("embed_scale")
+            ),
+            embed_model=document.get("embed_model", EMBEDDING_MODEL_NAME),
+            embed_version=document.get("embed_version", LEGACY_EMBEDDING_VERSION),
+            templates=cls.decode_templates(
+                document.get("templates"),
+                document.get("template_dtype", embed_dtype),
+                document.get("template_scales"),
+            ),
+            embed_dtype=embed_dtype,
+        )
+
+    @staticmethod
+    def template_fields(templates, dtype: str) -> dict:
+        # Templates carry their own dtype so a refresh can rewrite them alone.
+        codes, scales = Embedding.encode(templates, dtype)
+        return {
+            "templates": codes,
+            "template_dtype": dtype,
+            "template_scales": scales,
+            "template_count": len(templates),
+        }
+
+    def to_document(self) -> dict:
+        user_embed, embed_scale = Embedding.encode(self.user_embed, self.embed_dtype)
+        document = {
+            "UUID": self.UUID,
+            "user_embed": user_embed,
+            "embed_dtype": self.embed_dtype,
+            "embed_scale": embed_scale,
+            "embed_model": self.embed_model,
+            "embed_version": self.embed_version,
+        }
+        if self.templates is not None:
+            document.update(Embedding.template_fields(self.templates, self.embed_dtype))
+        return document
 
     def to_dict(self) -> dict:
         return self.__dict__
@@ -36,3 +36,21 @@ class AppException(Exception):
         Formatting object of AppException.
         """
         return str(AppException.__name__)
+
+
+class InferenceQueueFullError(Exception):
+    """
+    Raised when the inference executor has no free worker and its queue is full.
+    """
+
+
+class InvalidImageError(ValueError):
+    """
+    Raised when an upload is empty, too large or cannot be decoded as an image.
+    """
+
+
+class FaceNotDetectedError(ValueError):
+    """
+    Raised when no face is found and face detection is enforced.
+    """
@@ -0,0 +1,114 @@
+import queue
+import threading
+import time
+import numpy as np
+from concurrent.futures import Future
+from typing import Callable
+
+from faceapp.constant import (
+    EMBEDDING_BATCH_MAX_SIZE,
+    EMBEDDING_BATCH_WAIT_MS,
+    INFERENCE_TIMEOUT,
+)
+from faceapp.logger import logging
+
+
+class EmbeddingBatchScheduler:
+    """
+    Collects face batches from concurrent requests and embeds them with one
+    forward pass. A batch is flushed when it reaches max_batch_size faces or
+    when the oldest request has waited max_wait_ms.
+    """
+
+    def __init__(
+        self,
+        embed_fn: Callable[[np.ndarray], np.ndarray],
+        max_batch_size: int = EMBEDDING_BATCH_MAX_SIZE,
+        max_wait_ms: float = EMBEDDING_BATCH_WAIT_MS,
+    ) -> None:
+        self.embed_fn = embed_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.queue = queue.Queue()
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def start(self) -> None:
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(
+                    target=self._run, name="embedding-batch-scheduler", daemon=True
+                )
+                self.thread.start()
+
+    def stop(self) -> None:
+        with self.lock:
+            if self.thread is not None:
+                self.queue.put(None)
+                self.thread.join()
+                self.thread = None
+
+    def submit(self, face_batch: np.ndarray) -> Future:
+        # Queue the faces of one request and return a future of their embeddings.
+        if self.thread is None:
+            self.start()
+        future = Future()
+        self.queue.put((face_batch, future))
+        return future
+
+    def embed(
+        self, face_batch: np.ndarray, timeout: float = INFERENCE_TIMEOUT
+    ) -> np.ndarray:
+        # Bounded wait, so a stuck scheduler thread cannot hold a worker forever.
+        return self.submit(face_batch).result(timeout)
+
+    def _collect(self):
+        # Block for the first request, then gather more until the batch is full or the window closes.
+        item = self.queue.get()
+        if item is None:
+            return None, True
+        batch = [item]
+        size = len(item[0])
+        deadline = time.monotonic() + self.max_wait
+        while size < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self.queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+            size += len(item[0])
+        return batch, False
+
+    def _run(self) -> None:
+        stopped = False
+        while not stopped:
+            batch, stopped = self._collect()
+            if batch:
+                self._process(batch)
+
+    def _process(self, batch) -> None:
+        # Skip requests whose caller has already given up.
+        batch = [
+            (faces, future)
+            for faces, future in batch
+            if future.set_running_or_notify_cancel()
+        ]
+        if not batch:
+            return
+        try:
+            embeddings = self.embed_fn(np.concatenate([faces for faces, _ in batch]))
+        except Exception as e:
+            logging.error(f"Batched Embedding Failed: {e}")
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        offset = 0
+        for faces, future in batch:
+            future.set_result(embeddings[offset : offset + len(faces)])
+            offset += len(faces)
@@ -0,0 +1,73 @@
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from faceapp.constant import (
+    INFERENCE_POOL_SIZE,
+    INFERENCE_QUEUE_DEPTH,
+    INFERENCE_TIMEOUT,
+)
+from faceapp.exception import InferenceQueueFullError
+from faceapp.metrics import INFERENCE_IN_FLIGHT_GAUGE, INFERENCE_QUEUE_GAUGE
+
+
+class InferenceExecutor:
+    """
+    Bounded worker pool that runs CPU-bound work such as face inference off the event loop.
+    A thread pool is used so every worker shares the models loaded by the registry.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = INFERENCE_POOL_SIZE,
+        queue_depth: int = INFERENCE_QUEUE_DEPTH,
+        timeout: float = INFERENCE_TIMEOUT,
+        thread_name_prefix: str = "inference",
+    ) -> None:
+        self.pool_size = pool_size
+        self.capacity = pool_size + queue_depth
+        self.timeout = timeout
+        self.pending = 0
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(
+            max_workers=pool_size, thread_name_prefix=thread_name_prefix
+        )
+
+    @property
+    def queue_depth(self) -> int:
+        # Number of submitted jobs still waiting for a free worker.
+        return max(self.pending - self.pool_size, 0)
+
+    def _release(self, _future) -> None:
+        with self.lock:
+            self.pending -= 1
+
+    async def run(self, func, *args, **kwargs):
+        # Run the function in the pool, rejecting it when the queue is full.
+        with self.lock:
+            if self.pending >= self.capacity:
+                raise InferenceQueueFullError("Inference queue is full")
+            self.pending += 1
+
+        # Carry the caller's context, such as the request correlation ID, to the worker.
+        context = contextvars.copy_context()
+        future = self.executor.submit(
+            context.run, functools.partial(func, *args, **kwargs)
+        )
+        future.add_done_callback(self._release)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            # Drop the job if no worker has picked it up yet.
+            future.cancel()
+            raise
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=False)
+
+
+inference_executor = InferenceExecutor()
+INFERENCE_QUEUE_GAUGE.set_function(lambda: inference_executor.queue_depth)
+INFERENCE_IN_FLIGHT_GAUGE.set_function(lambda: inference_executor.pending)
@@ -0,0 +1,323 @@
+import threading
+import time
+import numpy as np
+from typing import List, Optional, Tuple
+
+from faceapp.constant import (
+    BURST_MATCH_THRESHOLD,
+    BURST_SIGNATURE_SIZE,
+    BURST_TRACKING_ENABLED,
+    DETECTOR_CASCADE,
+    DETECTOR_CROP_MARGIN,
+    DETECTOR_LATENCY_BUDGET_MS,
+    DETECTOR_SKIP_CONFIDENCE,
+    DETECTOR_UNALIGNED_FALLBACK,
+    ENFORCE_DETECTION,
+    INFERENCE_DETECT_CONCURRENCY,
+)
+from faceapp.exception import FaceNotDetectedError
+from faceapp.inference.model_registry import ModelRegistry
+from faceapp.metrics import DETECTOR_STAGE_LATENCY
+
+# First-stage detectors that only propose a face region.
+PROPOSAL_BACKENDS = ("opencv",)
+# Stage name under which the burst tracking checks are timed.
+TRACK_STAGE = "track"
+
+
+class FaceTrack:
+    """
+    Face region and eye positions of the last fully detected frame of a
+    burst, with a small grayscale signature of that region. Following frames
+    of the same size re-use the region, aligned on the same eyes, while their
+    crop still matches the signature, so a face that moved or a frame that
+    changed triggers a full detection again. hits counts the re-used frames.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = BURST_TRACKING_ENABLED,
+        match_threshold: float = BURST_MATCH_THRESHOLD,
+    ) -> None:
+        self.enabled = enabled
+        self.match_threshold = match_threshold
+        self.shape = None
+        self.region = None
+        self.eyes = None
+        self.reference = None
+        self.hits = 0
+
+    @staticmethod
+    def signature(img_array: np.ndarray, region: list) -> Optional[np.ndarray]:
+        # Zero-mean, unit-norm grayscale thumbnail of the region.
+        import cv2
+
+        x, y, w, h = region
+        patch = img_array[max(y, 0) : y + h, max(x, 0) : x + w]
+        if patch.size == 0:
+            return None
+        gray = cv2.cvtColor(patch, cv2.COLOR_RGB2GRAY)
+        thumbnail = cv2.resize(
+            gray,
+            (BURST_SIGNATURE_SIZE, BURST_SIGNATURE_SIZE),
+            interpolation=cv2.INTER_AREA,
+        ).astype(np.float32)
+        thumbnail = thumbnail.ravel() - thumbnail.mean()
+        norm = np.linalg.norm(thumbnail)
+        return thumbnail / norm if norm > 0 else None
+
+    def update(
+        self, img_array: np.ndarray, region: Optional[list], eyes: Optional[tuple]
+    ) -> None:
+        # Anchor the track on a fully detected and aligned frame; frames without a
+        # face, or whose eyes are unknown, reset it.
+        if not self.enabled:
+            return
+        self.shape = img_array.shape
+        self.region = region
+        self.eyes = eyes
+        self.reference = (
+            None
+            if region is None or eyes is None
+            else self.signature(img_array, region)
+        )
+
+    def matches(self, img_array: np.ndarray) -> bool:
+        # Normalized cross-correlation of the same region against the anchor frame.
+        if self.reference is None or img_array.shape != self.shape:
+            return False
+        current = self.signature(img_array, self.region)
+        if current is None:
+            return False
+        return float(np.dot(self.reference, current)) >= self.match_threshold
+
+
+class CascadeFaceDetector:
+    """
+    Face detector cascade. Cheap proposal stages locate a face region and the
+    last backend refines and aligns only the cropped region, or the whole
+    image when the crop yields no face. With unaligned_fallback, refinement is
+    skipped when a proposal is confident enough or the latency budget is
+    spent, and a failed refinement returns the proposal crop.
+    """
+
+    def __init__(
+        self,
+        backends: List[str] = DETECTOR_CASCADE,
+        latency_budget_ms: float = DETECTOR_LATENCY_BUDGET_MS,
+        skip_confidence: float = DETECTOR_SKIP_CONFIDENCE,
+        crop_margin: float = DETECTOR_CROP_MARGIN,
+        unaligned_fallback: bool = DETECTOR_UNALIGNED_FALLBACK,
+        concurrency: int = INFERENCE_DETECT_CONCURRENCY,
+    ) -> None:
+        for backend in backends[:-1]:
+            if backend not in PROPOSAL_BACKENDS:
+                raise ValueError(f"Unsupported proposal detector: {backend}")
+        self.proposal_backends = backends[:-1]
+        self.refine_backend = backends[-1]
+        self.latency_budget = latency_budget_ms / 1000
+        self.skip_confidence = skip_confidence
+        self.crop_margin = crop_margin
+        self.unaligned_fallback = unaligned_fallback
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        # The executor pool is sized for batching; detection itself is bounded here.
+        self.slots = threading.BoundedSemaphore(concurrency)
+        stages = [*backends, TRACK_STAGE]
+        self.timings = {stage: [0.0, 0] for stage in stages}
+        self.histograms = {
+            stage: DETECTOR_STAGE_LATENCY.labels(backend=stage) for stage in stages
+        }
+        self.skipped = 0
+        self.tracked = 0
+
+    def record(self, stage: str, seconds: float) -> None:
+        self.histograms[stage].observe(seconds)
+        with self.lock:
+            self.timings[stage][0] += seconds
+            self.timings[stage][1] += 1
+
+    def stats(self) -> dict:
+        # Mean milliseconds and call count of every stage.
+        with self.lock:
+            stats = {
+                stage: {
+                    "mean_ms": 1000 * total / count if count else 0.0,
+                    "calls": count,
+                }
+                for stage, (total, count) in self.timings.items()
+            }
+            stats["refine_skipped"] = self.skipped
+            stats["tracked"] = self.tracked
+            return stats
+
+    def haar_classifier(self) -> "cv2.CascadeClassifier":
+        # OpenCV classifiers are not thread-safe, so each worker thread gets its own.
+        import cv2
+
+        if not hasattr(self.local, "classifier"):
+            self.local.classifier = cv2.CascadeClassifier(
+                cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
+            )
+        return self.local.classifier
+
+    def propose(
+        self, backend: str, img_array: np.ndarray
+    ) -> Optional[Tuple[list, float]]:
+        # Return the most confident [x, y, w, h] region and its confidence.
+        import cv2
+
+        gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
+        faces, _, weights = self.haar_classifier().detectMultiScale3(
+            gray,
+            scaleFactor=1.1,
+            minNeighbors=5,
+            minSize=(40, 40),
+            outputRejectLevels=True,
+        )
+        if len(faces) == 0:
+            return None
+        best = int(np.argmax(weights))
+        return [int(value) for value in faces[best]], float(np.ravel(weights)[best])
+
+    def crop(
+        self, img_array: np.ndarray, region: list, margin: float
+    ) -> Tuple[np.ndarray, int, int]:
+        # Crop the region grown by margin on every side, clipped to the image.
+        x, y, w, h = region
+        dx, dy = int(w * margin), int(h * margin)
+        x0, y0 = max(x - dx, 0), max(y - dy, 0)
+        x1 = min(x + w + dx, img_array.shape[1])
+        y1 = min(y + h + dy, img_array.shape[0])
+        return img_array[y0:y1, x0:x1], x0, y0
+
+    def refine(
+        self, img_array: np.ndarray
+    ) -> Tuple[Optional[np.ndarray], list, Optional[tuple]]:
+        # Return the aligned face, its region and the (left, right) eye positions
+        # it was aligned on, which only the mtcnn backend reports.
+        from deepface.detectors import FaceDetector
+
+        try:
+            if self.refine_backend == "mtcnn":
+                return self.refine_mtcnn(img_array)
+            face, region = FaceDetector.detect_face(
+                ModelRegistry.get_detector(), self.refine_backend, img_array, align=True
+            )
+            return face, region, None
+        except Exception:
+            # Alignment fails on degenerate detections, treat them as no face.
+            return None, [0, 0, img_array.shape[1], img_array.shape[0]], None
+
+    def refine_mtcnn(
+        self, img_array: np.ndarray
+    ) -> Tuple[Optional[np.ndarray], list, Optional[tuple]]:
+        # Same detection and alignment as deepface's MTCNN wrapper, including its
+        # BGR to RGB conversion, keeping the eye positions of the first face.
+        import cv2
+        from deepface.detectors import FaceDetector
+
+        detections = ModelRegistry.get_detector().detect_faces(
+            cv2.cvtColor(img_array, cv2.COLOR_BGR2RGB)
+        )
+        if not detections:
+            return None, [0, 0, img_array.shape[1], img_array.shape[0]], None
+        x, y, w, h = detections[0]["box"]
+        keypoints = detections[0]["keypoints"]
+        eyes = (keypoints["left_eye"], keypoints["right_eye"])
+        face = img_array[int(y) : int(y + h), int(x) : int(x + w)]
+        return FaceDetector.alignment_procedure(face, *eyes), [x, y, w, h], eyes
+
+    def refine_timed(
+        self, img_array: np.ndarray
+    ) -> Tuple[Optional[np.ndarray], list, Optional[tuple]]:
+        stage_start = time.perf_counter()
+        refined = self.refine(img_array)
+        self.record(self.refine_backend, time.perf_counter() - stage_start)
+        return refined
+
+    def last_unaligned(self) -> bool:
+        # Whether the last detection on this thread returned an unaligned proposal crop.
+        return getattr(self.local, "unaligned", False)
+
+    def deadline(self) -> float:
+        # Latency budget deadline for one request, shared by all of its frames.
+        return time.perf_counter() + self.latency_budget
+
+    def detect(
+        self, img_array: np.ndarray, deadline: float = None, track: FaceTrack = None
+    ) -> Tuple[np.ndarray, list]:
+        # Return the aligned face and its [x, y, w, h] region, None if no face was found.
+        # With a track, the region of the previous burst frame is re-used while it
+        # matches, and aligned on the eye positions of that frame.
+        from deepface.detectors import FaceDetector
+
+        self.local.unaligned = False
+        if track is not None and track.enabled:
+            stage_start = time.perf_counter()
+            matched = track.matches(img_array)
+            if matched:
+                face = FaceDetector.alignment_procedure(
+                    self.crop(img_array, track.region, 0)[0], *track.eyes
+                )
+            self.record(TRACK_STAGE, time.perf_counter() - stage_start)
+            if matched:
+                track.hits += 1
+                with self.lock:
+                    self.tracked += 1
+                return face, list(track.region)
+
+        with self.slots:
+            face, region, eyes = self.detect_full(img_array, deadline)
+        if track is not None:
+            track.update(img_array, region, eyes)
+        return face, region
+
+    def detect_full(
+        self, img_array: np.ndarray, deadline: float = None
+    ) -> Tuple[np.ndarray, list, Optional[tuple]]:
+        # Return the face, its region and the eye positions it was aligned on.
+        if deadline is None:
+            deadline = self.deadline()
+        proposal = None
+        for backend in self.proposal_backends:
+            stage_start = time.perf_counter()
+            proposal = self.propose(backend, img_array)
+            self.record(backend, time.perf_counter() - stage_start)
+            if proposal is not None:
+                break
+
+        if proposal is not None:
+            region, confidence = proposal
+            over_budget = time.perf_counter() >= deadline
+            if self.unaligned_fallback and (
+                confidence >= self.skip_confidence or over_budget
+            ):
+                with self.lock:
+                    self.skipped += 1
+                self.local.unaligned = True
+                return self.crop(img_array, region, 0)[0], region, None
+            search_img, x0, y0 = self.crop(img_array, region, self.crop_margin)
+        else:
+            search_img, x0, y0 = img_array, 0, 0
+
+        face, region, eyes = self.refine_timed(search_img)
+        if (face is None or face.size == 0) and proposal is not None:
+            if self.unaligned_fallback:
+                self.local.unaligned = True
+                return self.crop(img_array, proposal[0], 0)[0], proposal[0], None
+            # A false proposal crop can hide the face; search the whole image.
+            face, region, eyes = self.refine_timed(img_array)
+            x0, y0 = 0, 0
+
+        if isinstance(face, np.ndarray) and face.size > 0:
+            x, y, w, h = region
+            if eyes is not None:
+                eyes = tuple((eye_x + x0, eye_y + y0) for eye_x, eye_y in eyes)
+            return face, [x + x0, y + y0, w, h], eyes
+        if ENFORCE_DETECTION:
+            raise FaceNotDetectedError("Face could not be detected.")
+        return img_array, None, None
+
+
+cascade_face_detector = CascadeFaceDetector()
@@ -0,0 +1,94 @@
+import sys
+import threading
+import numpy as np
+
+from faceapp.constant import (
+    DETECTOR_BACKEND,
+    EMBEDDING_MODEL_NAME,
+    INFERENCE_BACKEND,
+    ONNX_EMBED_INTRA_OP_THREADS,
+    WARM_UP_IMAGE_SHAPE,
+)
+from faceapp.exception import AppException
+from faceapp.inference.onnx_backend import OnnxModel, build_onnx_mtcnn, onnx_model_path
+from faceapp.logger import logging
+
+
+class ModelRegistry:
+    """
+    Process-wide registry of the face detector and the embedding model.
+    Both models are built once and shared by every request, from the
+    deepface Keras models or from their ONNX exports (INFERENCE_BACKEND).
+    deepface and TensorFlow are only imported when the models are loaded.
+    """
+
+    detector = None
+    model = None
+    ready = False
+    lock = threading.Lock()
+
+    @classmethod
+    def load(cls) -> None:
+        # Build the detector and the embedding model if they are not loaded yet.
+        from deepface import DeepFace
+        from deepface.detectors import FaceDetector
+
+        with cls.lock:
+            if cls.detector is None:
+                logging.info(f"Loading {DETECTOR_BACKEND} Face Detector.....")
+                if INFERENCE_BACKEND == "onnx" and DETECTOR_BACKEND == "mtcnn":
+                    cls.detector = build_onnx_mtcnn()
+                else:
+                    cls.detector = FaceDetector.build_model(DETECTOR_BACKEND)
+                logging.info("Face Detector Loaded.")
+
+            if cls.model is None:
+                logging.info(f"Loading {EMBEDDING_MODEL_NAME} Embedding Model.....")
+                if INFERENCE_BACKEND == "onnx":
+                    cls.model = OnnxModel(
+                        onnx_model_path(EMBEDDING_MODEL_NAME),
+                        intra_op_threads=ONNX_EMBED_INTRA_OP_THREADS,
+                    )
+                else:
+                    cls.model = DeepFace.build_model(EMBEDDING_MODEL_NAME)
+                logging.info("Embedding Model Loaded.")
+
+    @classmethod
+    def get_detector(cls):
+        if cls.detector is None:
+            cls.load()
+        return cls.detector
+
+    @classmethod
+    def get_model(cls):
+        if cls.model is None:
+            cls.load()
+        return cls.model
+
+    @classmethod
+    def warm_up(cls) -> None:
+        # Load the models and run one inference on a synthetic image.
+        from deepface import DeepFace
+        from deepface.detectors import FaceDetector
+
+        try:
+            cls.load()
+            logging.info("Warming Up the Models.....")
+            img_array = np.random.default_rng(0).integers(
+                0, 255, size=WARM_UP_IMAGE_SHAPE, dtype=np.uint8
+            )
+            FaceDetector.detect_face(
+                cls.detector, DETECTOR_BACKEND, img_array, align=True
+            )
+            DeepFace.represent(
+                img_path=img_array,
+                model_name=EMBEDDING_MODEL_NAME,
+                model=cls.model,
+                enforce_detection=False,
+            )
+            cls.ready = True
+            logging.info("Models Warmed Up.")
+
+        except Exception as e:
+            logging.error(f"Model Warm Up Failed: {e}")
+            raise AppException(e, sys) from e
@@ -0,0 +1,94 @@
+import os
+import numpy as np
+from types import SimpleNamespace
+
+from faceapp.constant import (
+    ONNX_INTER_OP_THREADS,
+    ONNX_INTRA_OP_THREADS,
+    ONNX_MODEL_DIR,
+)
+
+# MTCNN networks exported by faceapp.cli.export_onnx.
+MTCNN_NETWORKS = ("pnet", "rnet", "onet")
+# mtcnn release line whose detector internals build_onnx_mtcnn relies on.
+SUPPORTED_MTCNN_VERSION = "0.1."
+
+
+def onnx_model_path(name: str, model_dir: str = ONNX_MODEL_DIR) -> str:
+    return os.path.join(model_dir, f"{name.lower()}.onnx")
+
+
+class OnnxModel:
+    """
+    ONNX Runtime session with the part of the Keras model interface the
+    pipeline uses: predict() returns one array, or a list for several
+    outputs, and layers[0].input_shape feeds functions.find_input_shape.
+    """
+
+    def __init__(
+        self,
+        model_path: str,
+        intra_op_threads: int = ONNX_INTRA_OP_THREADS,
+        inter_op_threads: int = ONNX_INTER_OP_THREADS,
+    ) -> None:
+        import onnxruntime
+
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = intra_op_threads
+        options.inter_op_num_threads = inter_op_threads
+        if inter_op_threads > 1:
+            options.execution_mode = onnxruntime.ExecutionMode.ORT_PARALLEL
+        options.graph_optimization_level = (
+            onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        )
+        self.session = onnxruntime.InferenceSession(
+            model_path, options, providers=["CPUExecutionProvider"]
+        )
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        input_shape = tuple(
+            dim if isinstance(dim, int) else None for dim in model_input.shape
+        )
+        self.layers = [SimpleNamespace(input_shape=input_shape)]
+
+    def predict(self, batch: np.ndarray, **kwargs):
+        outputs = self.session.run(
+            None, {self.input_name: np.asarray(batch, dtype=np.float32)}
+        )
+        return outputs[0] if len(outputs) == 1 else outputs
+
+
+def build_onnx_mtcnn(model_dir: str = ONNX_MODEL_DIR):
+    # MTCNN keeps its proposal and bounding box logic in Python and only calls
+    # predict() on its three networks, so the ONNX sessions replace them as-is.
+    from importlib.metadata import version
+    from mtcnn import MTCNN
+
+    # The networks are private attributes of the 0.1 releases; later releases
+    # restructured the detector, so refuse them instead of failing mid-request.
+    if not version("mtcnn").startswith(SUPPORTED_MTCNN_VERSION):
+        raise RuntimeError(
+            f"The ONNX MTCNN detector needs mtcnn {SUPPORTED_MTCNN_VERSION}.x, "
+            f"found {version('mtcnn')}."
+        )
+
+    class OnnxMTCNN(MTCNN):
+        """MTCNN with ONNX Runtime sessions in place of its Keras networks."""
+
+        def __init__(
+            self,
+            min_face_size: int = 20,
+            steps_threshold: list = None,
+            scale_factor: float = 0.709,
+        ) -> None:
+            # Skip MTCNN.__init__, which builds the Keras nets, but set the same
+            # attributes so detect_faces() runs unchanged.
+            self._min_face_size = min_face_size
+            self._steps_threshold = steps_threshold or [0.6, 0.7, 0.7]
+            self._scale_factor = scale_factor
+            self._pnet, self._rnet, self._onet = (
+                OnnxModel(onnx_model_path(f"mtcnn_{network}", model_dir))
+                for network in MTCNN_NETWORKS
+            )
+
+    return OnnxMTCNN()
@@ -1,16 +1,108 @@
 import os
+import atexit
+import contextvars
+import copy
+import json
 import logging
+import queue
+import random
+import zlib
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+from faceapp.constant import (
+    LOG_BACKUP_COUNT,
+    LOG_INFO_SAMPLE_RATE,
+    LOG_LEVEL,
+    LOG_MAX_BYTES,
+    LOG_QUEUE_SIZE,
+)
+from faceapp.metrics import LOG_RECORDS_DROPPED
 
 LOG_FILE = f"{datetime.now().strftime('%m_%d_%Y_%H_%M_%S')}.log"
-logs_path = os.path.join(os.getcwd(), "logs", LOG_FILE)
+logs_path = os.path.join(os.getcwd(), "logs")
 
 os.makedirs(logs_path, exist_ok=True)
 
 LOG_FILE_PATH = os.path.join(logs_path, LOG_FILE)
 
-logging.basicConfig(
-    filename=LOG_FILE_PATH,
-    format="[ %(asctime)s ] %(lineno)d %(name)s - %(levelname)s - %(message)s",
-    level=logging.INFO,
+# Correlation ID of the request being served, set by the application middleware.
+correlation_id = contextvars.ContextVar("correlation_id", default=None)
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats every record as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "module": record.module,
+            "line": record.lineno,
+            "message": record.getMessage(),
+            "correlation_id": getattr(record, "correlation_id", None),
+        }
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class InfoSampler(logging.Filter):
+    """
+    Keeps every record above INFO and a share of INFO and lower records.
+    The decision is made per correlation ID, so a sampled request keeps
+    all of its lines.
+    """
+
+    def __init__(self, rate: float) -> None:
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.INFO or self.rate >= 1:
+            return True
+        request_id = correlation_id.get()
+        if request_id is None:
+            return random.random() < self.rate
+        return zlib.crc32(request_id.encode()) % 10000 < self.rate * 10000
+
+
+class ContextQueueHandler(QueueHandler):
+    """
+    Hands records to the background listener without blocking the caller.
+    Only the message is rendered on the calling thread; records are dropped
+    and counted when the queue is full.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg, record.args = record.getMessage(), None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        record.correlation_id = correlation_id.get()
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc()
+
+
+file_handler = RotatingFileHandler(
+    LOG_FILE_PATH, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, delay=True
 )
+file_handler.setFormatter(JsonFormatter())
+
+queue_handler = ContextQueueHandler(queue.Queue(maxsize=LOG_QUEUE_SIZE))
+queue_handler.addFilter(InfoSampler(LOG_INFO_SAMPLE_RATE))
+
+logging.getLogger().addHandler(queue_handler)
+logging.getLogger().setLevel(LOG_LEVEL)
+
+log_listener = QueueListener(queue_handler.queue, file_handler)
+log_listener.start()
+# Flush the records still queued when the process exits.
+atexit.register(log_listener.stop)
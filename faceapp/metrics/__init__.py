@@ -0,0 +1,102 @@
+from prometheus_client import Counter, Gauge, Histogram
+
+from faceapp.exception import FaceNotDetectedError, InvalidImageError
+
+LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+REQUEST_LATENCY = Histogram(
+    "faceapp_request_latency_seconds",
+    "End-to-end latency of every endpoint.",
+    ["method", "path", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+STAGE_LATENCY = Histogram(
+    "faceapp_stage_latency_seconds",
+    "Latency of each stage of the login, registration and embedding flows.",
+    ["stage"],
+    buckets=LATENCY_BUCKETS,
+)
+DETECTOR_STAGE_LATENCY = Histogram(
+    "faceapp_detector_stage_latency_seconds",
+    "Latency of each backend of the face detector cascade.",
+    ["backend"],
+    buckets=LATENCY_BUCKETS,
+)
+OUTCOMES = Counter(
+    "faceapp_outcomes_total",
+    "Outcome of every login, registration and identification request.",
+    ["flow", "outcome"],
+)
+INFERENCE_QUEUE_GAUGE = Gauge(
+    "faceapp_inference_queue_depth",
+    "Inference jobs waiting for a free worker.",
+)
+INFERENCE_IN_FLIGHT_GAUGE = Gauge(
+    "faceapp_inference_in_flight",
+    "Inference jobs running or queued.",
+)
+IMAGE_CACHE_LOOKUPS = Counter(
+    "faceapp_image_cache_lookups_total",
+    "Lookups of uploaded images in the content-addressed embedding cache.",
+    ["result"],
+)
+EMBEDDING_CACHE_LOOKUPS = Counter(
+    "faceapp_embedding_cache_lookups_total",
+    "Lookups of decoded user embeddings in the in-memory embedding cache.",
+    ["result"],
+)
+LOG_RECORDS_DROPPED = Counter(
+    "faceapp_log_records_dropped_total",
+    "Log records dropped because the logging queue was full.",
+)
+EMBEDDING_BATCH_QUEUE_GAUGE = Gauge(
+    "faceapp_embedding_batch_queue_depth",
+    "Requests waiting in the embedding batch scheduler.",
+)
+
+# Label children are bound once so the hot path only pays for observe().
+DECODE_LATENCY = STAGE_LATENCY.labels(stage="decode")
+DETECT_LATENCY = STAGE_LATENCY.labels(stage="detect")
+EMBED_LATENCY = STAGE_LATENCY.labels(stage="embed")
+SIMILARITY_LATENCY = STAGE_LATENCY.labels(stage="similarity")
+INDEX_SEARCH_LATENCY = STAGE_LATENCY.labels(stage="index_search")
+MONGO_LATENCY = STAGE_LATENCY.labels(stage="mongo")
+BCRYPT_LATENCY = STAGE_LATENCY.labels(stage="bcrypt")
+IMAGE_CACHE_HITS = IMAGE_CACHE_LOOKUPS.labels(result="hit")
+IMAGE_CACHE_DISK_HITS = IMAGE_CACHE_LOOKUPS.labels(result="disk_hit")
+IMAGE_CACHE_MISSES = IMAGE_CACHE_LOOKUPS.labels(result="miss")
+EMBEDDING_CACHE_HITS = EMBEDDING_CACHE_LOOKUPS.labels(result="hit")
+EMBEDDING_CACHE_MISSES = EMBEDDING_CACHE_LOOKUPS.labels(result="miss")
+
+
+def caused_by(error: BaseException, error_type: type) -> bool:
+    # Walk the exception chain, AppException wraps the original error.
+    while error is not None:
+        if isinstance(error, error_type):
+            return True
+        error = error.__cause__
+    return False
+
+
+def is_face_not_detected(error: BaseException) -> bool:
+    return caused_by(error, FaceNotDetectedError)
+
+
+def is_invalid_image(error: BaseException) -> bool:
+    return caused_by(error, InvalidImageError)
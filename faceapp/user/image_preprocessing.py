@@ -0,0 +1,46 @@
+import io
+import sys
+import numpy as np
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from faceapp.constant import IMAGE_MAX_BYTES, IMAGE_MAX_PIXELS, IMAGE_MAX_SIDE
+from faceapp.exception import AppException, InvalidImageError
+from faceapp.metrics import DECODE_LATENCY
+
+
+class ImagePreprocessing:
+    @staticmethod
+    def open_image(contents: bytes) -> Image.Image:
+        # Read only the image header and reject inputs that are too large to decode.
+        if not contents:
+            raise InvalidImageError("Empty image upload")
+        if len(contents) > IMAGE_MAX_BYTES:
+            raise InvalidImageError(f"Image exceeds {IMAGE_MAX_BYTES} bytes")
+        try:
+            img = Image.open(io.BytesIO(contents))
+        except UnidentifiedImageError as e:
+            raise InvalidImageError("Undecodable image upload") from e
+        width, height = img.size
+        if width * height > IMAGE_MAX_PIXELS:
+            raise InvalidImageError(f"Image exceeds {IMAGE_MAX_PIXELS} pixels")
+        return img
+
+    @staticmethod
+    @DECODE_LATENCY.time()
+    def decode_image(contents: bytes, max_side: int = IMAGE_MAX_SIDE) -> np.ndarray:
+        # Decode the upload into an upright RGB uint8 array no larger than max_side.
+        try:
+            img = ImagePreprocessing.open_image(contents)
+            try:
+                # JPEGs are downscaled by the decoder itself; other formats are reduced after decoding.
+                img.draft("RGB", (max_side, max_side))
+                img.thumbnail((max_side, max_side), reducing_gap=2.0)
+                img = ImageOps.exif_transpose(img)
+                if img.mode != "RGB":
+                    img = img.convert("RGB")
+                return np.asarray(img, dtype=np.uint8)
+            except OSError as e:
+                raise InvalidImageError(f"Undecodable image upload: {e}") from e
+
+        except Exception as e:
+            raise AppException(e, sys) from e
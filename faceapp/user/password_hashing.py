@@ -0,0 +1,60 @@
+from typing import Optional, Tuple
+from passlib.context import CryptContext
+
+from faceapp.constant import (
+    BCRYPT_POOL_SIZE,
+    BCRYPT_QUEUE_DEPTH,
+    BCRYPT_ROUNDS,
+    BCRYPT_TIMEOUT,
+)
+from faceapp.inference.executor import InferenceExecutor
+from faceapp.metrics import BCRYPT_LATENCY
+
+
+class PasswordHasher:
+    """
+    Shared bcrypt service. Hashing runs on a dedicated bounded thread pool so
+    the event loop stays free; bcrypt releases the GIL while it works.
+    """
+
+    def __init__(
+        self,
+        rounds: int = BCRYPT_ROUNDS,
+        pool_size: int = BCRYPT_POOL_SIZE,
+        queue_depth: int = BCRYPT_QUEUE_DEPTH,
+        timeout: float = BCRYPT_TIMEOUT,
+    ) -> None:
+        # Hashes below the configured cost are reported as needing an update.
+        self.context = CryptContext(
+            schemes=["bcrypt"],
+            deprecated="auto",
+            bcrypt__default_rounds=rounds,
+            bcrypt__min_rounds=rounds,
+        )
+        self.executor = InferenceExecutor(
+            pool_size, queue_depth, timeout, thread_name_prefix="bcrypt"
+        )
+
+    @BCRYPT_LATENCY.time()
+    def hash_sync(self, password: str) -> str:
+        return self.context.hash(password)
+
+    @BCRYPT_LATENCY.time()
+    def verify_and_update_sync(
+        self, password: str, hashed_password: str
+    ) -> Tuple[bool, Optional[str]]:
+        return self.context.verify_and_update(password, hashed_password)
+
+    async def hash(self, password: str) -> str:
+        return await self.executor.run(self.hash_sync, password)
+
+    async def verify_and_update(
+        self, password: str, hashed_password: str
+    ) -> Tuple[bool, Optional[str]]:
+        # Return whether the password matches and a new hash when the stored cost is outdated.
+        return await self.executor.run(
+            self.verify_and_update_sync, password, hashed_password
+        )
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,147 @@
+import numpy as np
+
+from faceapp.constant import (
+    EMBEDDING_SIZE,
+    PROGRESSIVE_ACCEPT_MARGIN,
+    PROGRESSIVE_MIN_FRAMES,
+    PROGRESSIVE_REJECT_MARGIN,
+    SIMILARITY_THRESHOLD,
+    TEMPLATE_AGGREGATION,
+    TEMPLATE_MAX_COUNT,
+    TEMPLATE_TOP_K,
+)
+
+
+class TemplateMatcher:
+    """
+    Scores a user's enrolled templates against the frames of a login attempt.
+    Templates and probes are L2-normalised float32 rows, so a single
+    (T x 128) . (128 x P) product gives the cosine similarity of every pair.
+    """
+
+    @staticmethod
+    def normalize(embeddings) -> np.ndarray:
+        matrix = np.asarray(embeddings, dtype=np.float32).reshape(-1, EMBEDDING_SIZE)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.where(norms > 0, norms, 1.0)
+
+    @staticmethod
+    def select_templates(embeddings, max_count: int = TEMPLATE_MAX_COUNT) -> np.ndarray:
+        # Keep up to max_count diverse frames: start from the frame closest to the
+        # mean, then repeatedly add the frame least similar to those already kept.
+        candidates = TemplateMatcher.normalize(embeddings)
+        if len(candidates) <= max_count:
+            return candidates
+        centroid = TemplateMatcher.normalize(candidates.mean(axis=0))[0]
+        selected = [int(np.argmax(candidates @ centroid))]
+        closest = candidates @ candidates[selected[0]]
+        while len(selected) < max_count:
+            closest[selected] = np.inf
+            selected.append(int(np.argmin(closest)))
+            closest = np.maximum(closest, candidates @ candidates[selected[-1]])
+        return candidates[selected]
+
+    @staticmethod
+    def aggregate(
+        scores: np.ndarray,
+        aggregation: str = TEMPLATE_AGGREGATION,
+        top_k: int = TEMPLATE_TOP_K,
+    ) -> float:
+        # Reduce the template x probe similarity matrix to one score.
+        if aggregation == "max":
+            return float(scores.max())
+        if aggregation == "mean":
+            return float(scores.mean())
+        if aggregation == "topk":
+            flat = scores.reshape(-1)
+            k = min(top_k, flat.size)
+            return float(np.partition(flat, flat.size - k)[-k:].mean())
+        raise ValueError(f"Unknown template aggregation: {aggregation}")
+
+    @staticmethod
+    def score(
+        templates: np.ndarray,
+        probes,
+        aggregation: str = TEMPLATE_AGGREGATION,
+        top_k: int = TEMPLATE_TOP_K,
+        centroid: np.ndarray = None,
+    ) -> float:
+        # Templates are stored normalised; only the probe frames need normalising.
+        # "centroid" compares the stored enrollment mean (the templates' mean when
+        # none is given) with the mean frame.
+        probes = TemplateMatcher.normalize(probes)
+        if aggregation == "centroid":
+            if centroid is None:
+                centroid = templates.mean(axis=0)
+            centroids = TemplateMatcher.normalize(
+                [np.reshape(centroid, -1), probes.mean(axis=0)]
+            )
+            return float(centroids[0] @ centroids[1])
+        scores = templates @ probes.T
+        return TemplateMatcher.aggregate(scores, aggregation, top_k)
+
+    @staticmethod
+    def refresh(
+        templates: np.ndarray, probes, max_count: int = TEMPLATE_MAX_COUNT
+    ) -> np.ndarray:
+        # Add the mean of a confident login as a template. When the set is full it
+        # replaces the template closest to it, so the set stays diverse.
+        probe = TemplateMatcher.normalize(
+            TemplateMatcher.normalize(probes).mean(axis=0)
+        )
+        if len(templates) < max_count:
+            return np.concatenate([templates, probe])
+        refreshed = np.array(templates, dtype=np.float32)
+        refreshed[int(np.argmax(templates @ probe[0]))] = probe[0]
+        return refreshed
+
+
+class ProgressiveDecision:
+    """
+    Running template score over the frames of one login attempt. It becomes
+    confident once enough frames with a face were seen and the score clears
+    the accept or reject margin, so the remaining frames can be skipped.
+    """
+
+    def __init__(
+        self,
+        templates: np.ndarray,
+        threshold: float = SIMILARITY_THRESHOLD,
+        accept_margin: float = PROGRESSIVE_ACCEPT_MARGIN,
+        reject_margin: float = PROGRESSIVE_REJECT_MARGIN,
+        min_frames: int = PROGRESSIVE_MIN_FRAMES,
+        centroid: np.ndarray = None,
+    ) -> None:
+        self.templates = templates
+        self.centroid = centroid
+        self.threshold = threshold
+        self.accept_margin = accept_margin
+        self.reject_margin = reject_margin
+        self.min_frames = min_frames
+        self.embeddings = []
+        self.score = None
+        self.confident = False
+
+    @property
+    def frames_used(self) -> int:
+        return len(self.embeddings)
+
+    @property
+    def accepted(self) -> bool:
+        return self.score is not None and self.score >= self.threshold
+
+    def add(self, embeddings: np.ndarray, face_found: bool = True) -> float:
+        # Re-score every frame so far; frames without a face never end the attempt.
+        self.embeddings.extend(np.reshape(embeddings, (-1, EMBEDDING_SIZE)))
+        self.score = TemplateMatcher.score(
+            self.templates, self.embeddings, centroid=self.centroid
+        )
+        self.confident = (
+            face_found
+            and self.frames_used >= self.min_frames
+            and (
+                self.score >= self.threshold + self.accept_margin
+                or self.score < self.threshold - self.reject_margin
+            )
+        )
+        return self.score
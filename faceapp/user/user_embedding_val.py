@@ -1,28 +1,45 @@
-import io
 import sys
 import numpy as np
 from ast import Bytes
-from typing import List
-from PIL import Image
-from deepface import DeepFace
-from deepface.commons.functions import detect_face
+from typing import List, Optional, Tuple
 
 from faceapp.constant import (
-    DETECTOR_BACKEND,
-    EMBEDDING_MODEL_NAME,
-    ENFORCE_DETECTION,
+    EMBEDDING_BATCHING_ENABLED,
+    IDENTIFICATION_TOP_K,
+    PROGRESSIVE_VERIFICATION_ENABLED,
     SIMILARITY_THRESHOLD,
+    TEMPLATE_REFRESH_ENABLED,
+    TEMPLATE_REFRESH_THRESHOLD,
 )
+from faceapp.data_access.embedding_index import embedding_index
+from faceapp.data_access.image_embedding_cache import NO_FACE, image_embedding_cache
 from faceapp.data_access.user_embedding_data import UserEmbeddingData
-from faceapp.exception import AppException
+from faceapp.exception import AppException, FaceNotDetectedError
+from faceapp.inference.batch_scheduler import EmbeddingBatchScheduler
+from faceapp.inference.face_detector import FaceTrack, cascade_face_detector
+from faceapp.inference.model_registry import ModelRegistry
 from faceapp.logger import logging
+from faceapp.metrics import (
+    DETECT_LATENCY,
+    EMBED_LATENCY,
+    EMBEDDING_BATCH_QUEUE_GAUGE,
+    INDEX_SEARCH_LATENCY,
+    OUTCOMES,
+    SIMILARITY_LATENCY,
+    is_face_not_detected,
+)
+from faceapp.user.image_preprocessing import ImagePreprocessing
+from faceapp.user.template_matching import ProgressiveDecision, TemplateMatcher
 
 
 class UserLoginEmbeddingValidation:
-    def __init__(self, uuid_: str) -> None:
+    def __init__(self, uuid_: str, user: dict = None) -> None:
+        # The stored embedding can be passed in when it was already fetched asynchronously.
         self.uuid_ = uuid_
         self.user_embedding_data = UserEmbeddingData()
-        self.user = self.user_embedding_data.get_user_embedding(uuid_)
+        self.user = user
+        if self.user is None:
+            self.user = self.user_embedding_data.get_user_embedding(uuid_)
 
     def validate(self) -> bool:
         try:
@@ -32,42 +49,177 @@ class UserLoginEmbeddingValidation:
         except Exception as e:
             raise e
 
+    def get_templates(self) -> np.ndarray:
+        # Users enrolled before templates existed are scored against their mean.
+        templates = self.user.get("templates")
+        if templates is None:
+            templates = TemplateMatcher.normalize(self.user["user_embed"])
+        return templates
+
+    def start_decision(self) -> ProgressiveDecision:
+        # Centroid scoring uses the stored enrollment mean, as the threshold was tuned on.
+        return ProgressiveDecision(
+            self.get_templates(), centroid=self.user["user_embed"]
+        )
+
+    def refresh_templates(self, embedding_list: np.ndarray) -> None:
+        # Fold a high-confidence login into the stored templates.
+        templates = TemplateMatcher.refresh(self.get_templates(), embedding_list)
+        self.user_embedding_data.update_templates(self.uuid_, templates)
+        logging.info("User Templates Refreshed.")
+
     @staticmethod
-    def generate_embedding(img_array: np.ndarray) -> np.ndarray:
+    def detect_faces(
+        img_arrays: List[np.ndarray],
+        regions: list = None,
+        deadline: float = None,
+        track: FaceTrack = None,
+    ) -> np.ndarray:
+        # Detect, align and resize the face of every frame into one model input batch.
+        # The face region of every frame is appended to regions when it is given.
+        # A track carries the face region from one burst frame to the next.
+        from deepface.commons import functions
+
         try:
-            # Generate embedding from the image array.
-            faces = detect_face(
-                img_array,
-                detector_backend=DETECTOR_BACKEND,
-                enforce_detection=ENFORCE_DETECTION,
-            )
-            # Generate embedding from the face.
-            return DeepFace.represent(
-                img_path=faces[0],
-                model_name=EMBEDDING_MODEL_NAME,
-                enforce_detection=False,
+            input_shape_x, input_shape_y = functions.find_input_shape(
+                ModelRegistry.get_model()
             )
+            if deadline is None:
+                deadline = cascade_face_detector.deadline()
+            face_list = []
+            for img_array in img_arrays:
+                with DETECT_LATENCY.time():
+                    detected_face, region = cascade_face_detector.detect(
+                        img_array, deadline, track
+                    )
+                if regions is not None:
+                    regions.append(region)
+                # Resize the detected face to the model input shape.
+                face = functions.preprocess_face(
+                    img=detected_face,
+                    target_size=(input_shape_y, input_shape_x),
+                    enforce_detection=False,
+                    detector_backend="skip",
+                )
+                face_list.append(face[0])
+            return np.stack(face_list)
         except Exception as e:
             raise AppException(e, sys) from e
 
     @staticmethod
-    def generate_embedding_list(files: List[Bytes]) -> List[np.ndarray]:
-        # Generate an embedding list from an image array.
-        embedding_list = []
-        for contents in files:
-            img = Image.open(io.BytesIO(contents))
-            # Read the image array.
-            img_array = np.array(img)
-            # Detect faces.
-            embed = UserLoginEmbeddingValidation.generate_embedding(img_array)
-            embedding_list.append(embed)
-        return embedding_list
+    def represent_faces(face_batch: np.ndarray) -> np.ndarray:
+        # Run one forward pass of the embedding model over the stacked faces.
+        from deepface.commons import functions
+
+        try:
+            face_batch = functions.normalize_input(img=face_batch, normalization="base")
+            embeddings = ModelRegistry.get_model().predict(face_batch)
+            return np.asarray(embeddings, dtype=np.float32)
+        except Exception as e:
+            raise AppException(e, sys) from e
+
+    @staticmethod
+    def embed_faces(face_batch: np.ndarray) -> np.ndarray:
+        # Share the forward pass with concurrent requests when batching is enabled.
+        with EMBED_LATENCY.time():
+            if EMBEDDING_BATCHING_ENABLED:
+                return embedding_batch_scheduler.embed(face_batch)
+            return UserLoginEmbeddingValidation.represent_faces(face_batch)
+
+    @staticmethod
+    def generate_embedding(img_array: np.ndarray) -> np.ndarray:
+        # Generate embedding from the image array.
+        face_batch = UserLoginEmbeddingValidation.detect_faces([img_array])
+        return UserLoginEmbeddingValidation.embed_faces(face_batch)[0]
+
+    @staticmethod
+    def cached_frame(key: str) -> Optional[tuple]:
+        # Return the cached (embedding, region) of an image, or raise its cached miss.
+        entry = image_embedding_cache.get(key)
+        if entry is NO_FACE:
+            raise FaceNotDetectedError("Face could not be detected.")
+        return entry
+
+    @staticmethod
+    def detect_frame(
+        contents: Bytes,
+        key: str,
+        regions: list,
+        deadline: float,
+        track: FaceTrack = None,
+        uncached: set = None,
+    ) -> np.ndarray:
+        # Decode and detect one uploaded image, caching images without a face.
+        # The key is added to uncached when the face is an unaligned fallback crop,
+        # which depends on the latency budget left and must not be cached.
+        try:
+            img_array = ImagePreprocessing.decode_image(contents)
+            face_batch = UserLoginEmbeddingValidation.detect_faces(
+                [img_array], regions, deadline, track
+            )
+            if uncached is not None and cascade_face_detector.last_unaligned():
+                uncached.add(key)
+            return face_batch
+        except Exception as e:
+            if is_face_not_detected(e):
+                image_embedding_cache.put(key, NO_FACE)
+            raise
+
+    @staticmethod
+    def embed_frame(
+        contents: Bytes, deadline: float = None, track: FaceTrack = None
+    ) -> tuple:
+        # Return the (embedding, region) of one image, from the cache when possible.
+        key = image_embedding_cache.key(contents)
+        entry = UserLoginEmbeddingValidation.cached_frame(key)
+        if entry is None:
+            regions, uncached = [], set()
+            face_batch = UserLoginEmbeddingValidation.detect_frame(
+                contents, key, regions, deadline, track, uncached
+            )
+            entry = (
+                UserLoginEmbeddingValidation.embed_faces(face_batch)[0],
+                regions[0],
+            )
+            if key not in uncached:
+                image_embedding_cache.put(key, entry)
+        return entry
 
     @staticmethod
-    def average_embedding(embedding_list: List[np.ndarray]) -> List:
-        # Function to calculate the average embedding of the list of embeddings.
-        avg_embed = np.mean(embedding_list, axis=0)
-        return avg_embed.tolist()
+    def generate_embedding_list(files: List[Bytes], regions: list = None) -> np.ndarray:
+        # Generate an (N, EMBEDDING_SIZE) embedding array from the uploaded images.
+        # Images seen before are served from the cache before any decode work, and
+        # the distinct others are embedded in one batch, detected as one burst.
+        keys = [image_embedding_cache.key(contents) for contents in files]
+        entries = {key: UserLoginEmbeddingValidation.cached_frame(key) for key in keys}
+        missing = {
+            key: files[index] for index, key in enumerate(keys) if entries[key] is None
+        }
+        if missing:
+            deadline = cascade_face_detector.deadline()
+            track = FaceTrack()
+            missing_regions, uncached = [], set()
+            face_batch = np.concatenate(
+                [
+                    UserLoginEmbeddingValidation.detect_frame(
+                        contents, key, missing_regions, deadline, track, uncached
+                    )
+                    for key, contents in missing.items()
+                ]
+            )
+            embeddings = UserLoginEmbeddingValidation.embed_faces(face_batch)
+            for key, embedding, region in zip(missing, embeddings, missing_regions):
+                entries[key] = (embedding, region)
+                if key not in uncached:
+                    image_embedding_cache.put(key, entries[key])
+        if regions is not None:
+            regions.extend(entries[key][1] for key in keys)
+        return np.stack([entries[key][0] for key in keys])
+
+    @staticmethod
+    def average_embedding(embedding_list: np.ndarray) -> np.ndarray:
+        # Function to calculate the average embedding of the embedding array.
+        return np.mean(embedding_list, axis=0)
 
     @staticmethod
     def cosine_simmilarity(db_embedding, current_embedding) -> bool:
@@ -79,61 +231,152 @@ class UserLoginEmbeddingValidation:
         except Exception as e:
             raise AppException(e, sys) from e
 
-    def compare_embedding(self, files: bytes) -> bool:
+    def progressive_decision(
+        self, files: List[Bytes], regions: list
+    ) -> ProgressiveDecision:
+        # Embed the frames in upload order and stop once the decision is confident.
+        decision = self.start_decision()
+        deadline = cascade_face_detector.deadline()
+        track = FaceTrack()
+        for contents in files:
+            embedding, region = UserLoginEmbeddingValidation.embed_frame(
+                contents, deadline, track
+            )
+            regions.append(region)
+            with SIMILARITY_LATENCY.time():
+                decision.add(embedding, region is not None)
+            if decision.confident:
+                break
+        return decision
+
+    def batch_decision(self, files: List[Bytes], regions: list) -> ProgressiveDecision:
+        # Embed every frame in one batch and score them together.
+        decision = self.start_decision()
+        embedding_list = UserLoginEmbeddingValidation.generate_embedding_list(
+            files, regions
+        )
+        with SIMILARITY_LATENCY.time():
+            decision.add(embedding_list)
+        return decision
+
+    def conclude(self, decision: ProgressiveDecision, regions: list) -> dict:
+        # Record the outcome of a finished attempt and return its result.
+        if decision.accepted:
+            logging.info("User Authenticated Successfully.")
+            OUTCOMES.labels("login", "authenticated").inc()
+            if (
+                TEMPLATE_REFRESH_ENABLED
+                and decision.score >= TEMPLATE_REFRESH_THRESHOLD
+            ):
+                self.refresh_templates(np.stack(decision.embeddings))
+        else:
+            logging.info("User Authentication Failed.")
+            if all(region is None for region in regions):
+                OUTCOMES.labels("login", "no_face").inc()
+            else:
+                OUTCOMES.labels("login", "rejected").inc()
+        return {
+            "status": decision.accepted,
+            "score": decision.score,
+            "frames_used": decision.frames_used,
+        }
+
+    def verify(self, files: List[Bytes]) -> dict:
+        # Return the decision together with its score and the number of frames used.
         try:
             if self.user:
                 logging.info("Validating User Embedding.....")
                 if self.validate() == False:
-                    return False
+                    return {"status": False, "score": None, "frames_used": 0}
                 logging.info("Embedding Validation Successful.")
 
-                logging.info("Generating Embedding List.....")
-                embedding_list = UserLoginEmbeddingValidation.generate_embedding_list(
-                    files
-                )
-                logging.info("Embedding List Generated.")
-
-                logging.info("Calculating Average Embedding.....")
-                avg_embedding_list = UserLoginEmbeddingValidation.average_embedding(
-                    embedding_list
-                )
-                logging.info("Average Embedding Calculated.")
-
-                # Get Embedding from the Database.
-                db_embedding = self.user["user_embed"]
-
-                logging.info("Calculating Cosine Similarity.....")
-                simmilarity = UserLoginEmbeddingValidation.cosine_simmilarity(
-                    db_embedding, avg_embedding_list
-                )
-                logging.info("Cosine Similarity Calculated.")
-
-                if simmilarity >= SIMILARITY_THRESHOLD:
-                    logging.info("User Authenticated Successfully.")
-                    return True
+                logging.info("Scoring Templates.....")
+                regions = []
+                if PROGRESSIVE_VERIFICATION_ENABLED:
+                    decision = self.progressive_decision(files, regions)
                 else:
-                    logging.info("User Authentication Failed.")
-                    return False
+                    decision = self.batch_decision(files, regions)
+                logging.info(
+                    f"Templates Scored on {decision.frames_used} of {len(files)} Frames."
+                )
+                return self.conclude(decision, regions)
 
             logging.info("User Authentication Failed.")
-            return False
+            OUTCOMES.labels("login", "rejected").inc()
+            return {"status": False, "score": None, "frames_used": 0}
 
         except Exception as e:
+            outcome = "no_face" if is_face_not_detected(e) else "error"
+            OUTCOMES.labels("login", outcome).inc()
             raise AppException(e, sys) from e
 
+    def compare_embedding(self, files: bytes) -> bool:
+        return self.verify(files)["status"]
+
+
+embedding_batch_scheduler = EmbeddingBatchScheduler(
+    UserLoginEmbeddingValidation.represent_faces
+)
+EMBEDDING_BATCH_QUEUE_GAUGE.set_function(embedding_batch_scheduler.queue.qsize)
+
 
 class UserRegisterEmbeddingValidation:
     def __init__(self, uuid_: str) -> None:
         self.uuid_ = uuid_
         self.user_embedding_data = UserEmbeddingData()
 
+    @staticmethod
+    def generate_user_embedding(files: bytes) -> Tuple[np.ndarray, np.ndarray]:
+        # Compute the mean embedding and the templates to store for the uploaded images.
+        try:
+            embedding_list = UserLoginEmbeddingValidation.generate_embedding_list(files)
+            return (
+                UserLoginEmbeddingValidation.average_embedding(embedding_list),
+                TemplateMatcher.select_templates(embedding_list),
+            )
+
+        except Exception as e:
+            raise AppException(e, sys) from e
+
     def save_embedding(self, files: bytes):
         try:
+            avg_embedding_list, templates = (
+                UserRegisterEmbeddingValidation.generate_user_embedding(files)
+            )
+            self.user_embedding_data.save_user_embedding(
+                self.uuid_, avg_embedding_list, templates
+            )
+
+        except Exception as e:
+            raise AppException(e, sys) from e
+
+
+class UserIdentificationValidation:
+    def __init__(self, top_k: int = IDENTIFICATION_TOP_K) -> None:
+        self.top_k = top_k
+        self.user_embedding_data = UserEmbeddingData()
+        self.user_embedding_data.load_embedding_index()
+
+    def identify(self, files: bytes) -> List[dict]:
+        # Return the top-k enrolled users most similar to the uploaded face.
+        try:
+            logging.info("Generating Embedding List.....")
             embedding_list = UserLoginEmbeddingValidation.generate_embedding_list(files)
-            avg_embedding_list = UserLoginEmbeddingValidation.average_embedding(
+            avg_embedding = UserLoginEmbeddingValidation.average_embedding(
                 embedding_list
             )
-            self.user_embedding_data.save_user_embedding(self.uuid_, avg_embedding_list)
+            logging.info("Searching the Embedding Index.....")
+            with INDEX_SEARCH_LATENCY.time():
+                matches = embedding_index.search(avg_embedding, self.top_k)
+            logging.info("Embedding Index Searched.")
+            return [
+                {
+                    "UUID": uuid_,
+                    "score": score,
+                    "matched": score >= SIMILARITY_THRESHOLD,
+                }
+                for uuid_, score in matches
+            ]
 
         except Exception as e:
             raise AppException(e, sys) from e
@@ -1,14 +1,14 @@
 import sys
 import re
-from typing import Optional
-from passlib.context import CryptContext
+import asyncio
+from typing import Optional, Tuple
+from pymongo.errors import DuplicateKeyError
 
-from faceapp.data_access.user_data import UserData
+from faceapp.data_access.async_user_data import AsyncUserData
 from faceapp.entity.user import User
-from faceapp.exception import AppException
+from faceapp.exception import AppException, InferenceQueueFullError
 from faceapp.logger import logging
-
-bcrypt_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from faceapp.user.password_hashing import password_hasher
 
 
 class LoginValidation:
@@ -37,8 +37,11 @@ class LoginValidation:
     def is_email_valid(self) -> bool:
         return bool(re.fullmatch(self.regex, self.email_id))
 
-    def verify_password(self, plain_password: str, hashed_password: str) -> bool:
-        return bcrypt_context.verify(plain_password, hashed_password)
+    async def verify_password(
+        self, plain_password: str, hashed_password: str
+    ) -> Tuple[bool, Optional[str]]:
+        # Returns the match status and a re-hashed password if the stored cost is outdated.
+        return await password_hasher.verify_and_update(plain_password, hashed_password)
 
     def validate_login(self) -> dict:
         # This function checks all the validation conditions for user registration.
@@ -46,24 +49,35 @@ class LoginValidation:
             return {"status": False, "msg": self.validate()}
         return {"status": True}
 
-    def authenticate_user_login(self) -> Optional[str]:
+    async def authenticate_user_login(self) -> Optional[str]:
         # This function authenticates the user and returns the token.
         try:
             logging.info("Authenticating User Details.....")
             if self.validate_login()["status"]:
-                userdata = UserData()
+                userdata = AsyncUserData()
                 logging.info("Fetching User Details from Database.....")
-                user_login_val = userdata.get_user({"email_id": self.email_id})
+                user_login_val = await userdata.get_user({"email_id": self.email_id})
                 if not user_login_val:
                     logging.info("User NOT FOUND while Login")
                     return False
-                if not self.verify_password(self.password, user_login_val["password"]):
+                verified, new_hash = await self.verify_password(
+                    self.password, user_login_val["password"]
+                )
+                if not verified:
                     logging.info("Incorrect Password.")
                     return False
+                if new_hash:
+                    logging.info("Re-hashing Password with the Current Cost.....")
+                    await userdata.update_user(
+                        {"UUID": user_login_val["UUID"]}, {"password": new_hash}
+                    )
                 logging.info("User Authenticated Successfully.")
                 return user_login_val
             return False
 
+        except (InferenceQueueFullError, asyncio.TimeoutError):
+            raise
+
         except Exception as e:
             raise AppException(e, sys) from e
 
@@ -80,15 +94,19 @@ class RegisterValidation:
                 r"([A-Za-z0-9]+[.-_])*[A-Za-z0-9]+@[A-Za-z0-9-]+(\.[A-Z|a-z]{2,})+"
             )
             self.uuid = self.user.uuid_
-            self.userdata = UserData()
-            self.bcrypt_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+            self.userdata = AsyncUserData()
+            self.validation_msg = None
 
         except Exception as e:
             raise e
 
-    def validate(self) -> bool:
+    async def validate(self) -> bool:
         # This function checks all the validation conditions for user registration.
+        # The result is computed once per request and reused afterwards.
         try:
+            if self.validation_msg is not None:
+                return self.validation_msg
+
             msg = ""
             if self.user.Name is None:
                 msg += "Enter Name"
@@ -117,9 +135,10 @@ class RegisterValidation:
             if not self.is_password_match():
                 msg += "Password does not match"
 
-            if not self.is_details_exists():
+            if not await self.is_details_exists():
                 msg += "User already exists"
 
+            self.validation_msg = msg
             return msg
 
         except Exception as e:
@@ -134,29 +153,38 @@ class RegisterValidation:
     def is_password_match(self) -> bool:
         return self.user.password1 == self.user.password2
 
-    def is_details_exists(self) -> bool:
-        username_val = self.userdata.get_user({"username": self.user.username})
-        emailid_val = self.userdata.get_user({"email_id": self.user.email_id})
-        uuid_val = self.userdata.get_user({"UUID": self.uuid})
-        return username_val is None and emailid_val is None and uuid_val is None
+    async def is_details_exists(self) -> bool:
+        # One indexed query checks the username, email id and UUID together.
+        user_val = await self.userdata.get_user(
+            {
+                "$or": [
+                    {"username": self.user.username},
+                    {"email_id": self.user.email_id},
+                    {"UUID": self.uuid},
+                ]
+            },
+            projection={"_id": 1},
+        )
+        return user_val is None
 
     @staticmethod
-    def get_password_hash(password: str) -> str:
-        return bcrypt_context.hash(password)
+    async def get_password_hash(password: str) -> str:
+        return await password_hasher.hash(password)
 
-    def validate_registration(self) -> bool:
+    async def validate_registration(self) -> bool:
         # This function checks all the validation conditions for user registration.
-        if len(self.validate()) != 0:
-            return {"status": False, "msg": self.validate()}
+        msg = await self.validate()
+        if len(msg) != 0:
+            return {"status": False, "msg": msg}
         return {"status": True}
 
-    def authenticate_user_registration(self) -> bool:
+    async def authenticate_user_registration(self) -> bool:
         # This function saves the user details in the database only after validating the user details.
         try:
             logging.info("Validating the user details during Registration.....")
-            if self.validate_registration()["status"]:
+            if (await self.validate_registration())["status"]:
                 logging.info("Generating the Password Hash.....")
-                hashed_password: str = self.get_password_hash(self.user.password1)
+                hashed_password: str = await self.get_password_hash(self.user.password1)
                 user_data_dict: dict = {
                     "Name": self.user.Name,
                     "username": self.user.username,
@@ -166,12 +194,17 @@ class RegisterValidation:
                     "UUID": self.uuid,
                 }
                 logging.info("Saving User Details in the Database.....")
-                self.userdata.save_user(user_data_dict)
+                try:
+                    await self.userdata.save_user(user_data_dict)
+                except DuplicateKeyError:
+                    # A concurrent registration won the race on a unique index.
+                    logging.info("User already exists during Registration.")
+                    return {"status": False, "msg": "User already exists"}
                 logging.info("Saved User Details in the Database.")
                 return {"status": True, "msg": "User Registered Successfully"}
 
             logging.info("Validation Failed during Registration.")
-            return {"status": False, "msg": self.validate()}
+            return {"status": False, "msg": await self.validate()}
 
         except Exception as e:
             raise e
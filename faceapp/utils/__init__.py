@@ -1,8 +1,7 @@
-import os
 import yaml
 from datetime import datetime
 from dateutil.parser import parse
-from dotenv import dotenv_values
+from faceapp.config.settings import REQUIRED, settings
 
 
 class CommonUtils:
@@ -30,9 +29,6 @@ class CommonUtils:
         total_seconds = self.get_difference_in_second(future_date_time, past_date_time)
         return total_seconds * 1000
 
-    def get_environment_variable(self, variable_name: str):
-        # Return Environment Variables.
-        if os.environ.get(variable_name) is not None:
-            return os.environ.get(variable_name)
-        enironment_variable = dotenv_values(".env")
-        return enironment_variable[variable_name]
+    def get_environment_variable(self, variable_name: str, default=None):
+        # Return Environment Variables from the settings parsed once at startup.
+        return settings.get_str(variable_name, REQUIRED if default is None else default)
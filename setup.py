@@ -21,4 +21,9 @@ setup(
     description="Face Authenticator App",
     packages=find_packages(),
     install_requires=get_requirements_list(),
+    extras_require={
+        # ONNX Runtime inference backend and the export of the Keras models to it.
+        "onnx": ["onnxruntime", "tf2onnx", "mtcnn>=0.1,<0.2"],
+        "test": ["pytest", "scikit-image"],
+    },
 )
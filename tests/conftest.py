@@ -0,0 +1,35 @@
+import os
+import numpy as np
+import pytest
+
+# The tests run offline with the settings the application otherwise reads from .env.
+for name, value in {
+    "SECRET_KEY": "tests",
+    "ALGORITHM": "HS256",
+    "MONGODB_URL_KEY": "mongomock://tests",
+    "DATABASE_NAME": "faceapp",
+    "USER_COLLECTION_NAME": "users",
+    "EMBEDDING_COLLECTION_NAME": "embeddings",
+}.items():
+    os.environ.setdefault(name, value)
+
+
+@pytest.fixture(scope="session")
+def face_image() -> np.ndarray:
+    # Public domain portrait bundled with scikit-image, as an RGB array.
+    data = pytest.importorskip("skimage.data")
+    return data.astronaut()
+
+
+@pytest.fixture(scope="session")
+def facenet_weights() -> str:
+    # The Keras models need the deepface weights, which are downloaded on first use.
+    path = os.path.join(
+        os.getenv("DEEPFACE_HOME", os.path.expanduser("~")),
+        ".deepface",
+        "weights",
+        "facenet_weights.h5",
+    )
+    if not os.path.exists(path):
+        pytest.skip("Facenet weights are not downloaded.")
+    return path
@@ -0,0 +1,32 @@
+from faceapp.cli.bulk_enroll import read_dataset
+
+
+def test_manifest_images_are_resolved_relative_to_the_manifest(tmp_path):
+    (tmp_path / "alice").mkdir()
+    for name in ("2.jpg", "1.jpg", "notes.txt"):
+        (tmp_path / "alice" / name).write_bytes(b"")
+    manifest = tmp_path / "manifest.csv"
+    manifest.write_text(
+        "username,password,images\n"
+        "alice,secret,alice\n"
+        "bob,secret,bob/1.jpg; bob/2.jpg\n"
+        "carol,secret,\n"
+        "dave,secret,  \n"
+    )
+
+    records = {
+        record["username"]: record["images"]
+        for record in read_dataset(str(manifest), "example.com")
+    }
+
+    assert records["alice"] == [
+        str(tmp_path / "alice" / "1.jpg"),
+        str(tmp_path / "alice" / "2.jpg"),
+    ]
+    assert records["bob"] == [
+        str(tmp_path / "bob" / "1.jpg"),
+        str(tmp_path / "bob" / "2.jpg"),
+    ]
+    # A blank cell must not enroll every image next to the manifest.
+    assert records["carol"] == []
+    assert records["dave"] == []
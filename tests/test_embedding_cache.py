@@ -0,0 +1,51 @@
+from prometheus_client import REGISTRY
+
+from faceapp.data_access.embedding_cache import EmbeddingCache
+
+
+def lookups(result: str) -> float:
+    return REGISTRY.get_sample_value(
+        "faceapp_embedding_cache_lookups_total", {"result": result}
+    )
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = EmbeddingCache(max_size=2, ttl=60)
+    cache.put("a", {"UUID": "a"})
+    cache.put("b", {"UUID": "b"})
+    assert cache.get("a") == {"UUID": "a"}
+    cache.put("c", {"UUID": "c"})
+
+    assert cache.get("b") is None
+    assert cache.get("a") == {"UUID": "a"}
+    assert cache.get("c") == {"UUID": "c"}
+    assert cache.stats() == {"size": 2, "hits": 3, "misses": 1}
+
+
+def test_expired_entries_are_dropped():
+    cache = EmbeddingCache(max_size=2, ttl=-1)
+    cache.put("a", {"UUID": "a"})
+    assert cache.get("a") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_invalidate_and_disabled_cache():
+    cache = EmbeddingCache(max_size=2, ttl=60)
+    cache.put("a", {"UUID": "a"})
+    cache.invalidate("a")
+    assert cache.get("a") is None
+
+    disabled = EmbeddingCache(max_size=0, ttl=60)
+    disabled.put("a", {"UUID": "a"})
+    assert disabled.get("a") is None
+
+
+def test_lookups_are_exported_as_metrics():
+    cache = EmbeddingCache(max_size=2, ttl=60)
+    hits, misses = lookups("hit"), lookups("miss")
+    cache.put("a", {"UUID": "a"})
+    cache.get("a")
+    cache.get("b")
+    cache.get("b")
+    assert lookups("hit") == hits + 1
+    assert lookups("miss") == misses + 2
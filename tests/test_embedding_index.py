@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from faceapp.data_access.embedding_index import EmbeddingIndex
+
+
+@pytest.fixture
+def embeddings() -> dict:
+    rng = np.random.default_rng(0)
+    return {f"user-{index}": rng.normal(size=128) for index in range(5)}
+
+
+@pytest.mark.parametrize("dtype", ["float32", "float16", "int8"])
+def test_search_ranks_the_enrolled_user_first(embeddings, dtype):
+    index = EmbeddingIndex(capacity=2, dtype=dtype)
+    for uuid_, embedding in embeddings.items():
+        index.upsert(uuid_, embedding)
+    assert index.size == len(embeddings)
+
+    results = index.search(embeddings["user-3"] * 2, top_k=3)
+    assert [uuid_ for uuid_, _ in results][0] == "user-3"
+    assert results[0][1] == pytest.approx(1.0, abs=0.01)
+    assert len(results) == 3
+    assert [score for _, score in results] == sorted(
+        (score for _, score in results), reverse=True
+    )
+
+
+def test_float16_rows_are_scanned_as_float32():
+    index = EmbeddingIndex(dtype="float16")
+    assert index.matrix.dtype == np.float32
+    assert EmbeddingIndex(dtype="int8").matrix.dtype == np.int8
+
+
+def test_upsert_replaces_the_existing_row(embeddings):
+    index = EmbeddingIndex()
+    index.upsert("user-0", embeddings["user-0"])
+    index.upsert("user-0", embeddings["user-1"])
+    assert index.size == 1
+    assert index.search(embeddings["user-1"], top_k=5)[0][1] == pytest.approx(1.0)
+
+
+def test_remove_keeps_the_remaining_rows_searchable(embeddings):
+    index = EmbeddingIndex()
+    for uuid_, embedding in embeddings.items():
+        index.upsert(uuid_, embedding)
+    index.remove("user-1")
+    index.remove("unknown")
+
+    assert index.size == 4
+    assert "user-1" not in index.rows
+    for uuid_ in ["user-0", "user-2", "user-3", "user-4"]:
+        assert index.search(embeddings[uuid_], top_k=1)[0][0] == uuid_
+    assert index.uuids[index.rows["user-4"]] == "user-4"
+
+
+def test_load_replaces_the_rows(embeddings):
+    index = EmbeddingIndex()
+    index.upsert("stale", embeddings["user-0"])
+    index.load(
+        [
+            {"UUID": uuid_, "user_embed": embedding.tolist()}
+            for uuid_, embedding in embeddings.items()
+        ]
+        + [{"UUID": "no-embedding", "user_embed": None}]
+    )
+    assert index.loaded
+    assert sorted(index.uuids) == sorted(embeddings)
+    assert index.search(embeddings["user-2"], top_k=1)[0][0] == "user-2"
+
+
+def test_search_on_an_empty_index():
+    assert EmbeddingIndex().search(np.ones(128), top_k=5) == []
@@ -0,0 +1,47 @@
+import asyncio
+import threading
+import pytest
+
+from faceapp.exception import InferenceQueueFullError
+from faceapp.inference.executor import InferenceExecutor
+
+
+def test_jobs_beyond_the_queue_depth_are_rejected():
+    async def scenario():
+        executor = InferenceExecutor(pool_size=1, queue_depth=1, timeout=5)
+        release = threading.Event()
+        # One job occupies the worker and one waits in the queue.
+        jobs = [asyncio.ensure_future(executor.run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0)
+        assert executor.pending == 2
+        assert executor.queue_depth == 1
+
+        with pytest.raises(InferenceQueueFullError):
+            await executor.run(release.wait)
+
+        release.set()
+        assert await asyncio.gather(*jobs) == [True, True]
+        assert executor.pending == 0
+        executor.shutdown()
+
+    asyncio.run(scenario())
+
+
+def test_timed_out_jobs_are_dropped_from_the_queue():
+    async def scenario():
+        executor = InferenceExecutor(pool_size=1, queue_depth=1, timeout=0.05)
+        release = threading.Event()
+        calls = []
+        running = asyncio.ensure_future(executor.run(release.wait))
+        await asyncio.sleep(0)
+        with pytest.raises(asyncio.TimeoutError):
+            await executor.run(calls.append, "queued")
+        release.set()
+        with pytest.raises(asyncio.TimeoutError):
+            await running
+        executor.executor.shutdown(wait=True)
+        # The queued job never ran and its slot was given back.
+        assert calls == []
+        assert executor.pending == 0
+
+    asyncio.run(scenario())
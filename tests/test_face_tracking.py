@@ -0,0 +1,95 @@
+import math
+import numpy as np
+import pytest
+from PIL import Image
+
+from faceapp.inference.face_detector import CascadeFaceDetector, FaceTrack
+
+
+@pytest.fixture(scope="module")
+def rotated_burst(face_image) -> list:
+    # A face tilted by 15 degrees around its centre, with the small jitter of a
+    # handheld burst.
+    base = Image.fromarray(face_image)
+    return [
+        np.asarray(
+            base.rotate(15 + 0.2 * index, center=(225, 115), translate=(index % 2, 0))
+        )
+        for index in range(4)
+    ]
+
+
+@pytest.fixture(scope="module")
+def detector() -> CascadeFaceDetector:
+    return CascadeFaceDetector(backends=["mtcnn"])
+
+
+@pytest.fixture(scope="module")
+def detections(detector, rotated_burst) -> dict:
+    # The burst detected with tracking, every frame fully detected, and the raw
+    # crops of the tracked regions.
+    track = FaceTrack(enabled=True)
+    tracked = [detector.detect(img, math.inf, track) for img in rotated_burst]
+    assert track.hits == len(rotated_burst) - 1
+    return {
+        "track": track,
+        "tracked": [face for face, _ in tracked],
+        "full": [detector.detect(img, math.inf)[0] for img in rotated_burst],
+        "unaligned": [
+            detector.crop(img, region, 0)[0]
+            for img, (_, region) in zip(rotated_burst, tracked)
+        ],
+    }
+
+
+def preprocess(faces: list) -> np.ndarray:
+    from deepface.commons import functions
+
+    return np.stack(
+        [
+            functions.preprocess_face(
+                img=face,
+                target_size=(160, 160),
+                enforce_detection=False,
+                detector_backend="skip",
+            )[0]
+            for face in faces
+        ]
+    )
+
+
+def test_tracked_frames_are_rotated_like_full_detections(detections):
+    full = preprocess(detections["full"])
+    tracked_diff = np.abs(preprocess(detections["tracked"]) - full).mean(axis=(1, 2, 3))
+    unaligned_diff = np.abs(preprocess(detections["unaligned"]) - full).mean(
+        axis=(1, 2, 3)
+    )
+    # Without the anchor frame's alignment the tracked crops stay tilted.
+    assert (tracked_diff < unaligned_diff / 2).all()
+
+
+def eye_angle(eyes: tuple) -> float:
+    (left_x, left_y), (right_x, right_y) = eyes
+    return math.degrees(math.atan2(right_y - left_y, right_x - left_x))
+
+
+def test_tracked_frames_are_aligned_on_the_anchor_eyes(
+    detector, detections, face_image, rotated_burst
+):
+    from deepface.detectors import FaceDetector
+
+    track = detections["track"]
+    _, region, eyes = detector.detect_full(rotated_burst[0], math.inf)
+    assert track.region == region
+    assert track.eyes == eyes
+
+    # The anchor eyes carry the tilt of the burst relative to the upright face.
+    _, _, upright_eyes = detector.detect_full(face_image, math.inf)
+    assert eye_angle(eyes) - eye_angle(upright_eyes) == pytest.approx(-15, abs=2)
+
+    # Every following frame is rotated by the anchor frame's eye line.
+    for img, face in zip(rotated_burst[1:], detections["tracked"][1:]):
+        expected = FaceDetector.alignment_procedure(
+            detector.crop(img, region, 0)[0], *eyes
+        )
+        np.testing.assert_array_equal(face, expected)
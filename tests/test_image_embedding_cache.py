@@ -0,0 +1,44 @@
+import os
+import numpy as np
+
+from faceapp.data_access.image_embedding_cache import NO_FACE, ImageEmbeddingCache
+
+
+def test_key_depends_on_the_contents_and_the_settings():
+    cache = ImageEmbeddingCache(cache_dir="")
+    key = cache.key(b"image")
+    assert key == cache.key(b"image")
+    assert key != cache.key(b"other image")
+    assert key.endswith(f"-{cache.namespace}")
+
+
+def test_entries_are_reloaded_from_disk(tmp_path):
+    cache = ImageEmbeddingCache(max_size=1, cache_dir=str(tmp_path))
+    embedding = np.arange(128, dtype=np.float32)
+    cache.put("aa-face", (embedding, [1, 2, 3, 4]))
+    cache.put("bb-none", NO_FACE)
+
+    # A fresh instance has nothing in memory, so both entries come from disk.
+    reloaded = ImageEmbeddingCache(max_size=1, cache_dir=str(tmp_path))
+    stored, region = reloaded.get("aa-face")
+    np.testing.assert_array_equal(stored, embedding)
+    assert region == [1, 2, 3, 4]
+    assert not stored.flags.writeable
+    assert reloaded.get("bb-none") is NO_FACE
+    assert reloaded.get("cc-missing") is None
+
+
+def test_prune_keeps_the_disk_tier_bounded(tmp_path):
+    cache = ImageEmbeddingCache(max_size=0, cache_dir=str(tmp_path), disk_max_size=10)
+    for index in range(25):
+        cache.put(f"{index:02d}-entry", NO_FACE)
+        assert cache.disk_size <= 10
+
+    files = [
+        name
+        for folder in os.listdir(tmp_path)
+        for name in os.listdir(tmp_path / folder)
+    ]
+    assert len(files) == cache.disk_size
+    # The newest entry survives pruning.
+    assert cache.get("24-entry") is NO_FACE
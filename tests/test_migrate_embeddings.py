@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("mongomock")
+
+from faceapp.cli.migrate_embeddings import migrate_embeddings  # noqa: E402
+from faceapp.constant import EMBEDDING_VERSION  # noqa: E402
+from faceapp.data_access.user_embedding_data import UserEmbeddingData  # noqa: E402
+from faceapp.entity.user_embedding import Embedding  # noqa: E402
+
+
+@pytest.fixture
+def collection():
+    # A legacy BSON array document and a current packed float32 document.
+    collection = UserEmbeddingData().collection
+    collection.delete_many({})
+    rng = np.random.default_rng(0)
+    embeddings = rng.normal(size=(2, 128)).astype(np.float32)
+    collection.insert_one({"UUID": "legacy", "user_embed": embeddings[0].tolist()})
+    collection.insert_one(
+        Embedding(UUID="current", user_embed=embeddings[1]).to_document()
+    )
+    yield collection, embeddings
+    collection.delete_many({})
+
+
+def stored(collection, uuid_: str) -> np.ndarray:
+    return Embedding.from_document(collection.find_one({"UUID": uuid_})).user_embed
+
+
+def test_migration_packs_every_document(collection):
+    collection, embeddings = collection
+    report = migrate_embeddings(dtype="float16")
+    assert report == {"scanned": 2, "migrated": 2, "reenroll": 1}
+
+    legacy = collection.find_one({"UUID": "legacy"})
+    assert legacy["embed_dtype"] == "float16"
+    assert legacy["embed_version"] < EMBEDDING_VERSION
+    assert collection.find_one({"UUID": "current"})["embed_version"] == (
+        EMBEDDING_VERSION
+    )
+    for uuid_, embedding in zip(["legacy", "current"], embeddings):
+        np.testing.assert_allclose(stored(collection, uuid_), embedding, atol=1e-2)
+
+    # Migrated documents are not rewritten again.
+    assert migrate_embeddings(dtype="float16") == {
+        "scanned": 0,
+        "migrated": 0,
+        "reenroll": 1,
+    }
+
+
+def test_dry_run_leaves_the_documents_untouched(collection):
+    collection, _ = collection
+    before = list(collection.find({}, {"_id": 0}))
+    report = migrate_embeddings(dry_run=True, dtype="int8")
+    assert report["migrated"] == 2
+    assert list(collection.find({}, {"_id": 0})) == before
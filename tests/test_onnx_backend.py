@@ -0,0 +1,68 @@
+import os
+import numpy as np
+import pytest
+
+pytest.importorskip("onnxruntime")
+
+from faceapp.constant import EMBEDDING_MODEL_NAME, ONNX_MODEL_DIR  # noqa: E402
+from faceapp.inference.onnx_backend import (  # noqa: E402
+    MTCNN_NETWORKS,
+    OnnxModel,
+    build_onnx_mtcnn,
+    onnx_model_path,
+)
+
+
+@pytest.fixture(scope="module")
+def onnx_model_dir() -> str:
+    names = [EMBEDDING_MODEL_NAME] + [f"mtcnn_{network}" for network in MTCNN_NETWORKS]
+    if not all(os.path.exists(onnx_model_path(name)) for name in names):
+        pytest.skip("ONNX models are not exported, see faceapp.cli.export_onnx.")
+    return ONNX_MODEL_DIR
+
+
+@pytest.fixture(scope="module")
+def face_batch(face_image, facenet_weights) -> np.ndarray:
+    # The aligned face of the fixture, preprocessed as the login pipeline does.
+    from deepface.commons import functions
+    from deepface.detectors import FaceDetector
+    from mtcnn import MTCNN
+
+    face, _ = FaceDetector.detect_face(MTCNN(), "mtcnn", face_image, align=True)
+    assert face is not None and face.size > 0
+    face = functions.preprocess_face(
+        img=face,
+        target_size=(160, 160),
+        enforce_detection=False,
+        detector_backend="skip",
+    )
+    return functions.normalize_input(img=face, normalization="base")
+
+
+def test_onnx_embedding_matches_keras(face_batch, onnx_model_dir):
+    from deepface import DeepFace
+
+    keras_embedding = DeepFace.build_model(EMBEDDING_MODEL_NAME).predict(face_batch)
+    onnx_embedding = OnnxModel(
+        onnx_model_path(EMBEDDING_MODEL_NAME, onnx_model_dir)
+    ).predict(face_batch)
+
+    keras_embedding, onnx_embedding = keras_embedding[0], onnx_embedding[0]
+    cosine = (
+        keras_embedding
+        @ onnx_embedding
+        / (np.linalg.norm(keras_embedding) * np.linalg.norm(onnx_embedding))
+    )
+    assert cosine > 1 - 1e-4
+
+
+def test_onnx_mtcnn_matches_keras(face_image, onnx_model_dir):
+    from mtcnn import MTCNN
+
+    keras_faces = MTCNN().detect_faces(face_image)
+    onnx_faces = build_onnx_mtcnn(onnx_model_dir).detect_faces(face_image)
+
+    assert len(keras_faces) == len(onnx_faces) > 0
+    for keras_face, onnx_face in zip(keras_faces, onnx_faces):
+        assert np.abs(np.subtract(keras_face["box"], onnx_face["box"])).max() <= 1
+        assert onnx_face["keypoints"].keys() == keras_face["keypoints"].keys()
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from faceapp.data_access.embedding_quantization import (
+    STORAGE_DTYPES,
+    EmbeddingQuantizer,
+)
+
+
+@pytest.fixture
+def embeddings() -> np.ndarray:
+    matrix = np.random.default_rng(0).normal(size=(50, 128)).astype(np.float32)
+    matrix[7] = 0
+    return matrix
+
+
+@pytest.mark.parametrize("dtype", ["float32", "float16", "int8"])
+def test_round_trip(embeddings, dtype):
+    codes, scales = EmbeddingQuantizer.quantize(embeddings, dtype)
+    assert codes.dtype == np.dtype(STORAGE_DTYPES[dtype])
+    assert (scales is None) == (dtype != "int8")
+
+    restored = EmbeddingQuantizer.dequantize(codes, scales)
+    assert restored.dtype == np.float32
+    if dtype == "int8":
+        # Rounding to the nearest code loses at most half a step per value.
+        assert (np.abs(restored - embeddings) <= scales[:, None] / 2 + 1e-6).all()
+    else:
+        np.testing.assert_allclose(restored, embeddings, rtol=1e-3, atol=1e-3)
+    assert not restored[7].any()
+
+
+@pytest.mark.parametrize("dtype", ["float32", "float16", "int8"])
+def test_blocked_score_matches_the_dequantized_product(embeddings, dtype):
+    codes, scales = EmbeddingQuantizer.quantize(embeddings, dtype)
+    probe = embeddings[3]
+    scores = EmbeddingQuantizer.score(codes, scales, probe, block_rows=16)
+    np.testing.assert_allclose(
+        scores,
+        EmbeddingQuantizer.dequantize(codes, scales) @ probe,
+        rtol=1e-5,
+        atol=1e-4,
+    )
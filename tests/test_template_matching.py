@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+from faceapp.user.template_matching import ProgressiveDecision, TemplateMatcher
+
+
+def unit(*weights) -> np.ndarray:
+    # A 128-d embedding with the given leading components.
+    vector = np.zeros(128, dtype=np.float32)
+    vector[: len(weights)] = weights
+    return vector
+
+
+@pytest.fixture
+def templates() -> np.ndarray:
+    return TemplateMatcher.normalize([unit(1, 0), unit(0, 1)])
+
+
+@pytest.mark.parametrize(
+    "aggregation, expected",
+    [("max", 1.0), ("mean", 0.5), ("topk", 1.0), ("centroid", np.sqrt(0.5))],
+)
+def test_aggregation(templates, aggregation, expected):
+    probes = [unit(2, 0), unit(3, 0)]
+    score = TemplateMatcher.score(templates, probes, aggregation, top_k=2)
+    assert score == pytest.approx(expected, abs=1e-6)
+
+
+def test_unknown_aggregation_is_rejected(templates):
+    with pytest.raises(ValueError):
+        TemplateMatcher.score(templates, [unit(1, 0)], "median")
+
+
+def test_select_templates_keeps_diverse_frames():
+    frames = [unit(1, 0), unit(1, 0.01), unit(1, 0.02), unit(0, 1)]
+    selected = TemplateMatcher.select_templates(frames, max_count=2)
+    assert len(selected) == 2
+    # The outlier is kept alongside the frame closest to the mean.
+    assert selected[1] @ TemplateMatcher.normalize(unit(0, 1))[0] == pytest.approx(1)
+
+
+def test_refresh_replaces_the_closest_template(templates):
+    refreshed = TemplateMatcher.refresh(templates, [unit(1, 0.1)], max_count=2)
+    assert refreshed.shape == templates.shape
+    np.testing.assert_allclose(refreshed[1], templates[1])
+    assert refreshed[0] @ templates[0] < 1
+    assert len(TemplateMatcher.refresh(templates, [unit(1, 0.1)], max_count=3)) == 3
+
+
+def test_progressive_decision_accepts_after_min_frames(templates):
+    decision = ProgressiveDecision(
+        templates[:1],
+        threshold=0.75,
+        accept_margin=0.1,
+        reject_margin=0.25,
+        min_frames=2,
+    )
+    decision.add(unit(1, 0))
+    assert decision.accepted and not decision.confident
+    decision.add(unit(1, 0.1))
+    assert decision.confident and decision.frames_used == 2
+
+
+def test_progressive_decision_rejects_and_waits_for_a_face(templates):
+    decision = ProgressiveDecision(
+        templates[:1],
+        threshold=0.75,
+        accept_margin=0.1,
+        reject_margin=0.25,
+        min_frames=1,
+    )
+    decision.add(unit(0, 1), face_found=False)
+    assert not decision.confident
+    decision.add(unit(0, 1))
+    assert decision.confident and not decision.accepted
+
+
+def test_centroid_scoring_uses_the_stored_enrollment_mean(templates):
+    # The stored mean can differ from the mean of the selected templates.
+    stored = unit(3, 0)
+    probes = [unit(1, 0)]
+    assert TemplateMatcher.score(
+        templates, probes, "centroid", centroid=stored
+    ) == pytest.approx(1.0)
+
+    decision = ProgressiveDecision(templates, centroid=stored)
+    decision.add(unit(1, 0))
+    assert decision.score == pytest.approx(1.0)
@@ -0,0 +1,105 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("mongomock")
+
+from faceapp.data_access import user_embedding_data  # noqa: E402
+from faceapp.data_access.embedding_cache import EmbeddingCache  # noqa: E402
+from faceapp.data_access.embedding_index import EmbeddingIndex  # noqa: E402
+from faceapp.data_access.user_embedding_data import UserEmbeddingData  # noqa: E402
+from faceapp.entity.user_embedding import Embedding  # noqa: E402
+
+
+@pytest.fixture
+def embedding_data(monkeypatch) -> UserEmbeddingData:
+    # A clean collection, with a private index and cache per test.
+    monkeypatch.setattr(user_embedding_data, "embedding_index", EmbeddingIndex())
+    monkeypatch.setattr(user_embedding_data, "embedding_cache", EmbeddingCache())
+    data = UserEmbeddingData()
+    data.collection.delete_many({})
+    yield data
+    data.collection.delete_many({})
+
+
+def embedding(seed: int) -> np.ndarray:
+    return np.random.default_rng(seed).normal(size=128).astype(np.float32)
+
+
+def insert(data: UserEmbeddingData, uuid_: str, seed: int) -> None:
+    # Enrollment by another process: the document bypasses this process' index.
+    data.collection.insert_one(
+        Embedding(UUID=uuid_, user_embed=embedding(seed)).to_document()
+    )
+
+
+def test_refresh_only_reads_new_documents(embedding_data, monkeypatch):
+    index = user_embedding_data.embedding_index
+    insert(embedding_data, "user-0", 0)
+    embedding_data.load_embedding_index()
+    assert index.uuids == ["user-0"]
+
+    last_id = index.last_id
+    insert(embedding_data, "user-1", 1)
+    queries = []
+    find = embedding_data.collection.find
+    monkeypatch.setattr(
+        embedding_data.collection,
+        "find",
+        lambda query, *args: queries.append(query) or find(query, *args),
+    )
+    embedding_data.load_embedding_index(refresh=True)
+
+    assert queries == [{"_id": {"$gt": last_id}}]
+    assert index.last_id > last_id
+    assert sorted(index.uuids) == ["user-0", "user-1"]
+    assert index.search(embedding(1), top_k=1)[0][0] == "user-1"
+
+
+def test_refresh_rebuilds_the_index_after_the_full_reload_interval(
+    embedding_data, monkeypatch
+):
+    index = user_embedding_data.embedding_index
+    insert(embedding_data, "user-0", 0)
+    insert(embedding_data, "user-1", 1)
+    embedding_data.load_embedding_index()
+    embedding_data.collection.delete_one({"UUID": "user-0"})
+
+    embedding_data.load_embedding_index(refresh=True)
+    assert sorted(index.uuids) == ["user-0", "user-1"]
+
+    monkeypatch.setattr(user_embedding_data, "EMBEDDING_INDEX_FULL_RELOAD_SECONDS", 1)
+    index.loaded_at -= 1
+    embedding_data.load_embedding_index(refresh=True)
+    assert index.uuids == ["user-1"]
+
+
+def test_delete_user_removes_the_embeddings(embedding_data):
+    from faceapp.data_access.user_data import UserData
+
+    users = UserData()
+    for uuid_, seed in [("user-0", 0), ("user-1", 1)]:
+        users.collection.insert_one({"UUID": uuid_, "username": uuid_})
+        embedding_data.save_user_embedding(uuid_, embedding(seed))
+    embedding_data.load_embedding_index()
+    assert embedding_data.get_user_embedding("user-0") is not None
+
+    users.delete_user("user-0")
+
+    assert users.get_user({"UUID": "user-0"}) is None
+    assert embedding_data.collection.count_documents({"UUID": "user-0"}) == 0
+    assert user_embedding_data.embedding_cache.get("user-0") is None
+    assert user_embedding_data.embedding_index.uuids == ["user-1"]
+    assert embedding_data.get_user_embedding("user-0") is None
+    users.delete_all_users()
+    assert user_embedding_data.embedding_index.size == 0
+
+
+def test_saving_again_replaces_the_embedding(embedding_data):
+    embedding_data.create_indexes()
+    embedding_data.save_user_embedding("user-0", embedding(0))
+    embedding_data.save_user_embedding("user-0", embedding(1))
+
+    assert embedding_data.collection.count_documents({"UUID": "user-0"}) == 1
+    user_embedding_data.embedding_cache.clear()
+    stored = embedding_data.get_user_embedding("user-0")["user_embed"]
+    np.testing.assert_allclose(stored, embedding(1))